@@ -1,22 +1,94 @@
 import os
 import re
-import networkx as nx
+import sys
+import json
+import sqlite3
+import hashlib
+import importlib.util
+import multiprocessing
+from array import array
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QPushButton, 
     QVBoxLayout, QWidget, QLineEdit, QLabel, QGraphicsScene, 
     QGraphicsView, QGraphicsEllipseItem, QGraphicsTextItem, 
-    QGraphicsLineItem, QSlider, QToolTip
+    QGraphicsLineItem, QGraphicsItem, QSlider, QToolTip, QProgressBar,
+    QHBoxLayout, QCheckBox, QSpinBox
 )
-from PyQt6.QtGui import QBrush, QPen, QPainter, QColor
-from PyQt6.QtCore import Qt, QTimer
-import math
-import random
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from PyQt6.QtGui import (
+    QBrush, QPen, QPainter, QColor, QFont, QFontMetrics, QKeySequence, QShortcut, QPolygonF
+)
+from PyQt6.QtCore import Qt, QTimer, QPointF, QLineF, QRectF, pyqtSignal
+from PyQt6 import sip
+import numpy as np
 import threading
+import time
+import queue
+from collections import namedtuple, deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+
+def lazy_import(name):
+    """Import ``name`` on first attribute access instead of at startup."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+nx = lazy_import("networkx")  # Slow to import; only needed for spring_layout and exports
 
 
 DISTANCE_MULTIPLIER = 10
+LAYOUT_SCALE = 500  # spring_layout scale; scene coordinates are this times DISTANCE_MULTIPLIER
+WARM_START_MIN_KNOWN = 0.5  # Share of nodes with a saved position needed to skip spring_layout
+POSITION_SAVE_INTERVAL_MS = 60000  # How often the layout is written to the vault's cache
+POSITION_LIMIT = 1e6  # Saved coordinates further out than this (or not finite) come from a diverged layout
+MULTILEVEL_MIN_NODES = 1000  # Graphs this large get multilevel_layout instead of spring_layout
+MULTILEVEL_COARSEST = 50  # Stop coarsening once a level is this small
+MULTILEVEL_MATCH_ROUNDS = 4  # Handshake rounds per coarsening level
+MULTILEVEL_ITERATIONS = 80  # Most force iterations spent on one level
+MULTILEVEL_MIN_ITERATIONS = 5  # Fewest, for the largest levels
+MULTILEVEL_STEP_BUDGET = 100000  # Node-steps per level; big levels get fewer iterations
+CENTER_FORCE_SCALE = 0.1  # center_force 0.01 -> pull of 0.001 per unit from the origin
+QUADTREE_DEPTH = 16
+REPULSION_BLOCK_PAIRS = 1 << 18  # Most candidate pairs the cutoff repulsion builds at once
+PHYSICS_INTERVAL_MS = 30
+ALPHA_MIN = 0.001  # The simulation sleeps once it has cooled below this
+ALPHA_DECAY = 1 - ALPHA_MIN ** (1 / 300)  # Cool from 1 to ALPHA_MIN in ~300 ticks
+REHEAT_ALPHA = 0.3  # Temperature after a drag, graph change or force change
+REST_ENERGY = 1e-4  # Mean squared speed below which nodes count as settled
+LABEL_ZOOM = 0.7  # Below this zoom only well-connected nodes keep their label
+LABEL_DEGREE = 8  # Degree needed for a label at half of LABEL_ZOOM (doubles as zoom halves)
+EDGE_DETAIL_ZOOM = 0.3  # Below this zoom edges are drawn without antialiasing
+CULL_MARGIN_PX = 50  # Items this close to the viewport still count as visible
+NODE_RADIUS = 5
+REPULSION_MIN_DISTANCE = 2 * NODE_RADIUS  # Closer nodes repel as if they were just touching
+NODE_COLOR = "#8e44ad"
+HIGHLIGHT_COLOR = "#c39bd3"
+LABEL_COLOR = "#dcdcdc"
+FILTER_DIM_OPACITY = 0.15  # Opacity of the items a search dims instead of hiding
+LOCAL_GRAPH_DEPTH = 1  # Default hops shown around the focused note in local graph mode
+LOCAL_CACHE_SIZE = 64  # Neighbourhoods kept per (note, depth, tags) before the oldest is dropped
+CLICK_DISTANCE_PX = 3  # A press and release closer than this selects instead of drags
+CACHE_DIR_NAME = ".hu-sidian"  # Per-vault folder for the metadata cache
+CACHE_FILE_NAME = "metadata.sqlite"
+CACHE_SCHEMA_VERSION = 2  # Bump whenever the parser output changes
+SCAN_CHUNK_SIZE = 64  # Files handed to a scan worker per task
+SCAN_START_METHOD = "forkserver"  # A forked worker could inherit a lock held by another thread
+CHANGE_QUIET_WINDOW = 0.3  # Seconds without new events before a change batch is applied
+CHANGE_MAX_DELAY = 2.0  # Flush a batch after this long even if events keep coming
+VAULT_LOAD_FIRST_CHUNK = 100  # Notes shown before the rest of the vault; later chunks double
+VAULT_PROGRESS_INTERVAL = 0.1  # Seconds between loading progress updates
+PERF_WINDOW = 300  # Samples kept per stage for the rolling statistics
+PERF_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)  # Histogram upper bounds
+PERF_LOG_ENV = "HUSIDIAN_PERF_LOG"  # Set to a file path to log every sample as JSON lines
+PERF_LOG_NAME = "perf.jsonl"  # Summaries dumped with F4 go here, next to the metadata cache
 
 def obsidian_dark_theme():
     return """
@@ -45,48 +117,1113 @@ def obsidian_dark_theme():
         QGraphicsView {
             border: none;
         }
+        QProgressBar {
+            background-color: #282828;
+            border: none;
+        }
+        QProgressBar::chunk {
+            background-color: #8e44ad;
+        }
     """
 
-class VaultChangeHandler(FileSystemEventHandler):
-    def __init__(self, app):
+class PerfStats:
+    """Rolling timings of the hot paths, for the overlay and the perf log.
+
+    Each stage keeps its last ``window`` samples. When a log is open every
+    sample is also appended to it as a JSON line, so a slow session can be
+    read back afterwards without attaching a profiler.
+    """
+
+    def __init__(self, window=PERF_WINDOW):
+        self.window = window
+        self.samples = {}  # stage -> deque of seconds
+        self.frames = deque(maxlen=window)  # perf_counter() of each painted frame
+        self.lock = threading.Lock()
+        self.log_file = None
+
+    def open_log(self, path):
+        self.close_log()
+        try:
+            self.log_file = open(path, "a", encoding="utf-8", buffering=1)
+        except OSError as e:
+            print(f"[WARN] Performance log unavailable: {e}")
+
+    def close_log(self):
+        with self.lock:
+            if self.log_file:
+                self.log_file.close()
+                self.log_file = None
+
+    @contextmanager
+    def measure(self, stage, **details):
+        """Time the body of a ``with`` block as one sample of ``stage``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started, **details)
+
+    def record(self, stage, seconds, **details):
+        with self.lock:
+            samples = self.samples.get(stage)
+            if samples is None:
+                samples = self.samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+            if self.log_file:
+                entry = {"time": time.time(), "stage": stage, "ms": round(seconds * 1000, 3), **details}
+                self.log_file.write(json.dumps(entry) + "\n")
+
+    def frame(self):
+        with self.lock:
+            self.frames.append(time.perf_counter())
+
+    def fps(self):
+        """Frames painted during the last second."""
+        cutoff = time.perf_counter() - 1.0
+        with self.lock:
+            return sum(1 for painted in self.frames if painted >= cutoff)
+
+    def summary(self, stage):
+        """Count, percentiles and a millisecond histogram of a stage's recent samples."""
+        with self.lock:
+            values = np.array(self.samples.get(stage, ())) * 1000
+        if not len(values):
+            return None
+        p50, p95 = np.percentile(values, [50, 95])
+        counts = np.bincount(np.searchsorted(PERF_BUCKETS_MS, values), minlength=len(PERF_BUCKETS_MS) + 1)
+        buckets = [f"<={bound}" for bound in PERF_BUCKETS_MS] + [f">{PERF_BUCKETS_MS[-1]}"]
+        return {
+            "stage": stage, "count": len(values), "last_ms": round(float(values[-1]), 3),
+            "p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3),
+            "max_ms": round(float(values.max()), 3),
+            "histogram_ms": {bucket: int(count) for bucket, count in zip(buckets, counts) if count},
+        }
+
+    def summaries(self):
+        with self.lock:
+            stages = list(self.samples)
+        return [summary for summary in map(self.summary, stages) if summary]
+
+    def dump(self, path, **details):
+        """Append one JSON line per stage with its current rolling statistics."""
+        now = time.time()
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                for summary in self.summaries():
+                    f.write(json.dumps({"time": now, **details, **summary}) + "\n")
+        except OSError as e:
+            print(f"[WARN] Could not write performance log: {e}")
+            return False
+        return True
+
+
+PERF = PerfStats()
+if os.environ.get(PERF_LOG_ENV):
+    PERF.open_log(os.environ[PERF_LOG_ENV])
+
+TAG_PATTERN = re.compile(r"(?<![^\s(\[{,;:'\"])#([\w/-]+)")
+LINK_PATTERN = re.compile(r"!?\[\[([^\[\]|#]*)(?:#[^\[\]|]*)?(?:\|[^\[\]]*)?\]\]")
+INLINE_CODE_PATTERN = re.compile(r"(`+).+?\1")
+URL_PATTERN = re.compile(r"\w[\w+.-]*://\S+")
+FENCE_PATTERN = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+FRONTMATTER_KEYS = {"tags": "tags", "tag": "tags", "aliases": "aliases", "alias": "aliases"}
+
+
+class MarkdownTokenizer:
+    """Single-pass scanner for a note's tags, [[links]] and aliases.
+
+    Fed one line at a time, so a note never has to be held in memory whole.
+    Skips fenced and inline code, URLs and the ``#heading``/``|alias``
+    parts of links, and reads ``tags``/``aliases`` from YAML frontmatter.
+    """
+
+    def __init__(self):
+        self.tags, self.links, self.aliases = set(), set(), set()
+        self.line_number = 0
+        self.in_frontmatter = False
+        self.frontmatter_key = None
+        self.fence = None
+
+    def result(self):
+        return self.tags, self.links, self.aliases
+
+    def feed(self, line):
+        self.line_number += 1
+        line = line.rstrip("\r\n")
+        if self.line_number == 1:
+            line = line.lstrip("\ufeff")
+            if line.strip() == "---":
+                self.in_frontmatter = True
+                return
+
+        if self.in_frontmatter:
+            if line.strip() in ("---", "..."):
+                self.in_frontmatter = False
+            else:
+                self.feed_frontmatter(line)
+            return
+
+        fence = FENCE_PATTERN.match(line)
+        if self.fence:
+            marker = fence.group(1) if fence else ""
+            if marker[:1] == self.fence[0] and len(marker) >= len(self.fence) and not line[fence.end():].strip():
+                self.fence = None
+            return
+        if fence:
+            self.fence = fence.group(1)
+            return
+
+        line = INLINE_CODE_PATTERN.sub(" ", line)
+        for match in LINK_PATTERN.finditer(line):
+            self.add_link(match.group(1))
+        line = URL_PATTERN.sub(" ", LINK_PATTERN.sub(" ", line))
+        for tag in TAG_PATTERN.findall(line):
+            self.add_tag(tag)
+
+    def feed_frontmatter(self, line):
+        stripped = line.strip()
+        if line[:1] not in (" ", "\t", "-") and ":" in line:
+            key, _, value = line.partition(":")
+            self.frontmatter_key = FRONTMATTER_KEYS.get(key.strip().lower())
+            value = value.strip()
+            if self.frontmatter_key and value:
+                values = value.strip("[]").split(",")
+                if self.frontmatter_key == "tags":
+                    values = [part for v in values for part in v.split()]
+                for v in values:
+                    self.add_frontmatter_value(v)
+        elif self.frontmatter_key and stripped.startswith("-"):
+            self.add_frontmatter_value(stripped[1:])
+
+    def add_frontmatter_value(self, value):
+        value = value.strip().strip("'\"")
+        if self.frontmatter_key == "tags":
+            self.add_tag(value)
+        elif value:
+            self.aliases.add(value)
+
+    def add_tag(self, tag):
+        tag = tag.lstrip("#").rstrip("/")
+        if tag and not tag.isdigit():  # Purely numeric tags are not tags in Obsidian
+            self.tags.add(tag)
+
+    def add_link(self, target):
+        target = target.strip()
+        if target.endswith(".md"):
+            target = target[:-3]
+        if target:  # [[#heading]] points into the same note
+            self.links.add(target)
+
+
+def parse_metadata(content):
+    """Extracts (tags, links, aliases) from Markdown text."""
+    tokenizer = MarkdownTokenizer()
+    for line in content.splitlines():
+        tokenizer.feed(line)
+    return tokenizer.result()
+
+
+def read_metadata(file_path):
+    """Stream one note and return (tags, links, aliases, content hash), or None if unreadable."""
+    tokenizer = MarkdownTokenizer()
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(file_path, 'rb') as f:
+            for raw_line in f:
+                digest.update(raw_line)
+                tokenizer.feed(raw_line.decode('utf-8', errors='replace'))
+    except OSError:
+        # File is likely still being written, was moved/deleted or is not a file
+        print(f"[WARN] Skipped file (unreadable): {file_path}")
+        return None
+    return (*tokenizer.result(), digest.hexdigest())
+
+
+def read_metadata_chunk(file_paths):
+    """Scan worker entry point: read_metadata for a chunk of files."""
+    return [read_metadata(file_path) for file_path in file_paths]
+
+
+def scan_vault(vault_path):
+    """List (relative path, full path, stat) for every .md note in the vault."""
+    return list(walk_vault(vault_path))
+
+
+def note_name(rel_path):
+    """Graph node name of a note: its vault-relative path with ``/`` separators."""
+    return rel_path.replace(os.sep, "/")
+
+
+def walk_vault(vault_path):
+    """Yield (relative path, full path, stat) for every .md note in the vault.
+
+    Uses ``os.scandir`` and visits folders depth-first in name order, so the
+    order is the same on every run.
+    """
+    folders = [vault_path]
+    while folders:
+        folder = folders.pop()
+        try:
+            with os.scandir(folder) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"[WARN] Skipped folder (unreadable): {folder} ({e})")
+            continue
+
+        subfolders = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subfolders.append(entry.path)
+            elif entry.name.endswith(".md"):
+                try:
+                    if not entry.is_file():
+                        continue  # e.g. a symlinked folder named like a note
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield os.path.relpath(entry.path, vault_path), entry.path, stat
+        folders.extend(reversed(subfolders))
+
+
+class MetadataCache:
+    """Persistent SQLite cache of each note's tags, links and aliases.
+
+    Rows are keyed by the note's path relative to the vault and remember the
+    mtime, size and content hash the tags/links were parsed from. The whole
+    table is loaded into memory on open, so lookups during a scan are a dict
+    access plus the ``os.stat`` the caller already did.
+
+    The last graph layout is kept alongside, in a ``positions`` table keyed
+    by node name.
+    """
+
+    def __init__(self, vault_path):
+        self.path = self.cache_path(vault_path)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != CACHE_SCHEMA_VERSION:
+            # Written by an older parser: start over
+            self.connection.execute("DROP TABLE IF EXISTS notes")
+            self.connection.execute(f"PRAGMA user_version = {CACHE_SCHEMA_VERSION}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS notes ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, "
+            "hash TEXT, tags TEXT, links TEXT, aliases TEXT)"
+        )
+        self.connection.execute("CREATE TABLE IF NOT EXISTS positions (name TEXT PRIMARY KEY, x REAL, y REAL)")
+        self.entries = {}
+        for path, mtime_ns, size, digest, *metadata in self.connection.execute("SELECT * FROM notes"):
+            self.entries[path] = (mtime_ns, size, digest, tuple(frozenset(json.loads(v)) for v in metadata))
+
+    @staticmethod
+    def cache_path(vault_path):
+        """Cache file inside the vault, or in the user cache dir if the vault is read-only."""
+        folder = os.path.join(vault_path, CACHE_DIR_NAME)
+        try:
+            os.makedirs(folder, exist_ok=True)
+            if os.access(folder, os.W_OK):
+                return os.path.join(folder, CACHE_FILE_NAME)
+        except OSError:
+            pass
+
+        folder = os.path.join(os.path.expanduser("~"), ".cache", "hu-sidian")
+        os.makedirs(folder, exist_ok=True)
+        vault_id = hashlib.sha1(os.path.abspath(vault_path).encode("utf-8")).hexdigest()
+        return os.path.join(folder, f"{vault_id}.sqlite")
+
+    def get(self, rel_path, stat):
+        """Cached (tags, links, aliases) if mtime and size still match, else None."""
+        entry = self.entries.get(rel_path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[3]
+        return None
+
+    def get_by_hash(self, rel_path, digest):
+        """Cached (tags, links, aliases) if the content is unchanged despite a new mtime."""
+        entry = self.entries.get(rel_path)
+        if entry and entry[2] == digest:
+            return entry[3]
+        return None
+
+    def put(self, rel_path, stat, digest, tags, links, aliases):
+        metadata = (frozenset(tags), frozenset(links), frozenset(aliases))
+        with self.lock:
+            self.entries[rel_path] = (stat.st_mtime_ns, stat.st_size, digest, metadata)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (rel_path, stat.st_mtime_ns, stat.st_size, digest,
+                 *(json.dumps(sorted(values)) for values in metadata)),
+            )
+
+    def remove(self, rel_path):
+        with self.lock:
+            if self.entries.pop(rel_path, None) is not None:
+                self.connection.execute("DELETE FROM notes WHERE path = ?", (rel_path,))
+
+    def prune(self, keep):
+        """Drop rows for notes that are no longer in the vault."""
+        for rel_path in set(self.entries) - set(keep):
+            self.remove(rel_path)
+
+    @staticmethod
+    def usable_position(x, y):
+        # Also false for NaN and infinities
+        return abs(x) <= POSITION_LIMIT and abs(y) <= POSITION_LIMIT
+
+    def load_positions(self):
+        """The saved layout as node name -> (x, y) in scene coordinates."""
+        with self.lock:
+            return {
+                name: (x, y) for name, x, y in self.connection.execute("SELECT name, x, y FROM positions")
+                if self.usable_position(x, y)
+            }
+
+    def save_positions(self, positions):
+        """Replace the saved layout with ``positions`` (node name -> (x, y)).
+
+        Positions outside POSITION_LIMIT are left out, so a layout that blew
+        up is not restored next session; those nodes are placed afresh.
+        """
+        with self.lock:
+            self.connection.execute("DELETE FROM positions")
+            self.connection.executemany(
+                "INSERT INTO positions VALUES (?, ?, ?)",
+                ((name, x, y) for name, (x, y) in positions.items() if self.usable_position(x, y)),
+            )
+
+    def commit(self):
+        with self.lock:
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
+
+
+NODE_NOTE, NODE_TAG, NODE_PLAIN_TAG = 0, 1, 2  # VaultGraph.kinds values
+
+
+def node_kind(name):
+    """NODE_NOTE for ``note.md``, NODE_TAG for ``#tag``, NODE_PLAIN_TAG for ``tag``."""
+    if name.endswith(".md"):
+        return NODE_NOTE
+    if name.startswith("#"):
+        return NODE_TAG
+    return NODE_PLAIN_TAG
+
+
+def node_label(name):
+    """Text shown next to a node: notes drop their folders."""
+    return name.rpartition("/")[2] if node_kind(name) == NODE_NOTE else name
+
+
+class VaultGraph:
+    """Compact undirected graph of the vault's notes and tags.
+
+    Each node name is interned once in ``names``; everything else refers to
+    nodes by integer id. ``kinds`` holds one byte per node (NODE_NOTE,
+    NODE_TAG or NODE_PLAIN_TAG) and ``adjacency[i]`` is an ``array('i')`` of
+    the ids next to node ``i``, so an edge costs 8 bytes instead of the
+    dicts networkx keeps per edge. Ids of removed nodes are reused.
+
+    The parts of the networkx.Graph API the app uses work on names;
+    ``csr()`` and ``coo()`` give the adjacency as NumPy arrays indexed by
+    id, and ``to_networkx()`` exports a networkx.Graph for analytics.
+    """
+
+    def __init__(self, nodes=(), edges=()):
+        self.names = []  # id -> name, None for a free id
+        self.index = {}  # name -> id
+        self.kinds = bytearray()
+        self.adjacency = []
+        self.free_ids = []
+        self.edge_count = 0
+        self.version = 0  # Bumped on every change; invalidates the arrays built by csr()/coo()
+        self.arrays = {}
+        for name in nodes:
+            self.add_node(name)
+        for name1, name2 in edges:
+            self.add_edge(name1, name2)
+
+    def changed(self):
+        self.version += 1
+        self.arrays.clear()
+
+    def clear(self):
+        self.names.clear()
+        self.index.clear()
+        self.kinds.clear()
+        self.adjacency.clear()
+        self.free_ids.clear()
+        self.edge_count = 0
+        self.changed()
+
+    def add_node(self, name):
+        """Id of ``name``, adding it first if it is new."""
+        node_id = self.index.get(name)
+        if node_id is not None:
+            return node_id
+        name = sys.intern(name)
+        if self.free_ids:
+            node_id = self.free_ids.pop()
+            self.names[node_id] = name
+            self.kinds[node_id] = node_kind(name)
+        else:
+            node_id = len(self.names)
+            self.names.append(name)
+            self.kinds.append(node_kind(name))
+            self.adjacency.append(array("i"))
+        self.index[name] = node_id
+        self.changed()
+        return node_id
+
+    def remove_node(self, name):
+        node_id = self.index.pop(name)
+        for neighbour in set(self.adjacency[node_id]):
+            if neighbour != node_id:
+                self.adjacency[neighbour].remove(node_id)
+        self.edge_count -= len(self.adjacency[node_id])
+        self.adjacency[node_id] = array("i")
+        self.names[node_id] = None
+        self.free_ids.append(node_id)
+        self.changed()
+
+    def add_edge(self, name1, name2):
+        """Join two nodes, adding them if needed; an existing edge is left alone."""
+        id1, id2 = self.add_node(name1), self.add_node(name2)
+        if self.has_edge_ids(id1, id2):
+            return
+        self.adjacency[id1].append(id2)
+        if id1 != id2:
+            self.adjacency[id2].append(id1)
+        self.edge_count += 1
+        self.changed()
+
+    def remove_edge(self, name1, name2):
+        id1, id2 = self.index[name1], self.index[name2]
+        if not self.has_edge_ids(id1, id2):
+            raise KeyError((name1, name2))
+        self.adjacency[id1].remove(id2)
+        if id1 != id2:
+            self.adjacency[id2].remove(id1)
+        self.edge_count -= 1
+        self.changed()
+
+    def has_edge_ids(self, id1, id2):
+        """Scans the shorter adjacency row, so a tag with thousands of notes stays cheap."""
+        row1, row2 = self.adjacency[id1], self.adjacency[id2]
+        return id2 in row1 if len(row1) <= len(row2) else id1 in row2
+
+    def has_node(self, name):
+        return name in self.index
+
+    def has_edge(self, name1, name2):
+        id1, id2 = self.index.get(name1), self.index.get(name2)
+        return id1 is not None and id2 is not None and self.has_edge_ids(id1, id2)
+
+    def neighbors(self, name):
+        return map(self.names.__getitem__, self.adjacency[self.index[name]])
+
+    def degree(self, name):
+        return len(self.adjacency[self.index[name]])
+
+    def kind(self, name):
+        return self.kinds[self.index[name]]
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def number_of_nodes(self):
+        return len(self.index)
+
+    def number_of_edges(self):
+        return self.edge_count
+
+    @property
+    def nodes(self):
+        return list(self.index)
+
+    @property
+    def edges(self):
+        """Every edge once, as a (name, name) pair, in a stable order."""
+        names = self.names
+        return [
+            (name, names[j])
+            for i, (name, row) in enumerate(zip(names, self.adjacency)) if name is not None
+            for j in row if j >= i
+        ]
+
+    def csr(self):
+        """(indptr, indices): the neighbours of id ``i`` are ``indices[indptr[i]:indptr[i + 1]]``."""
+        if "csr" not in self.arrays:
+            degrees = np.fromiter(map(len, self.adjacency), dtype=np.int64, count=len(self.adjacency))
+            indptr = np.zeros(len(self.adjacency) + 1, dtype=np.int64)
+            np.cumsum(degrees, out=indptr[1:])
+            indices = np.frombuffer(b"".join(row.tobytes() for row in self.adjacency), dtype=np.int32)
+            self.arrays["csr"] = (indptr, indices)
+        return self.arrays["csr"]
+
+    def coo(self):
+        """(edge_count, 2) array of id pairs, each edge once, in the order of ``edges``."""
+        if "coo" not in self.arrays:
+            indptr, indices = self.csr()
+            sources = np.repeat(np.arange(len(self.adjacency), dtype=np.int32), np.diff(indptr))
+            keep = indices >= sources
+            self.arrays["coo"] = np.column_stack([sources[keep], indices[keep]])
+        return self.arrays["coo"]
+
+    def ego_nodes(self, name, depth, include_tags=True):
+        """Names within ``depth`` hops of ``name``, found by BFS.
+
+        Only notes are expanded, so tags show up as leaves instead of pulling
+        in every note that shares them; ``include_tags=False`` leaves them out.
+        """
+        adjacency, kinds = self.adjacency, self.kinds
+        start = self.index[name]
+        seen = {start}
+        frontier = [start]
+        for _ in range(depth):
+            reached = []
+            for node_id in frontier:
+                if node_id != start and kinds[node_id] != NODE_NOTE:
+                    continue
+                for neighbour in adjacency[node_id]:
+                    if neighbour not in seen and (include_tags or kinds[neighbour] == NODE_NOTE):
+                        seen.add(neighbour)
+                        reached.append(neighbour)
+            frontier = reached
+        return frozenset(self.names[i] for i in seen)
+
+    def subgraph(self, nodes):
+        """A new VaultGraph with ``nodes`` and the edges between them."""
+        keep = [name for name in nodes if name in self.index]
+        ids = {self.index[name] for name in keep}
+        graph = VaultGraph(keep)
+        names = self.names
+        for name in keep:
+            node_id = self.index[name]
+            for j in self.adjacency[node_id]:
+                if j >= node_id and j in ids:
+                    graph.add_edge(name, names[j])
+        return graph
+
+    def copy(self):
+        return self.subgraph(self.index)
+
+    def to_networkx(self):
+        """The same graph as a networkx.Graph, with each node's kind as an attribute."""
+        graph = nx.Graph()
+        graph.add_nodes_from((name, {"kind": self.kinds[i]}) for name, i in self.index.items())
+        graph.add_edges_from(self.edges)
+        return graph
+
+
+class TagIndex:
+    """Inverted index of tag -> notes and note -> tags.
+
+    Tags are stored without the leading ``#``. Kept up to date by
+    build_graph and by every watcher change, so searching never touches
+    the vault.
+    """
+
+    def __init__(self):
+        self.notes_by_tag = {}
+        self.tags_by_note = {}
+
+    def clear(self):
+        self.notes_by_tag.clear()
+        self.tags_by_note.clear()
+
+    def set_note(self, note, tags):
+        old_tags = self.tags_by_note.get(note, frozenset())
+        tags = frozenset(tags)
+        for tag in old_tags - tags:
+            notes = self.notes_by_tag[tag]
+            notes.discard(note)
+            if not notes:
+                del self.notes_by_tag[tag]
+        for tag in tags - old_tags:
+            self.notes_by_tag.setdefault(tag, set()).add(note)
+        self.tags_by_note[note] = tags
+
+    def remove_note(self, note):
+        self.set_note(note, ())
+        del self.tags_by_note[note]
+
+    def notes_with(self, tag):
+        return self.notes_by_tag.get(tag.lstrip("#"), set())
+
+    def search(self, query):
+        """Resolve a tag query to (matching notes, tags that matched).
+
+        Whitespace-separated terms are OR'ed; tags joined with ``+`` inside
+        a term are AND'ed, e.g. ``#todo+#work #urgent``.
+        """
+        notes, matched_tags = set(), set()
+        for term in query.split():
+            tags = [tag.lstrip("#") for tag in term.split("+") if tag.startswith("#")]
+            if not tags:
+                continue
+            term_notes = set.intersection(*(self.notes_by_tag.get(tag, set()) for tag in tags))
+            if term_notes:
+                notes |= term_notes
+                matched_tags.update(tags)
+        return notes, matched_tags
+
+
+class LinkIndex:
+    """Resolves [[wikilinks]] to notes and keeps the backlinks of every note.
+
+    Notes are vault-relative paths such as ``folder/Note.md``. A link is
+    matched case-insensitively: ``[[folder/note]]`` against the end of a
+    note's path, ``[[note]]`` against file names and then aliases. When
+    several notes match, the one in the linking note's folder wins, then
+    the shallowest path. Unresolved links are remembered, so a note that
+    appears later is connected without a pass over the vault.
+
+    ``referrers`` maps each link key to the notes using it. Adding,
+    removing or renaming a note only re-resolves the links whose keys
+    could name it. Every change returns ``(added, removed)`` directed
+    links as (source, target) pairs.
+    """
+
+    def __init__(self):
+        self.by_name = {}  # Case-folded file name without .md -> paths
+        self.by_suffix = {}  # Case-folded "folder/name" path endings -> paths
+        self.by_alias = {}  # Case-folded alias -> paths
+        self.aliases_by_note = {}
+        self.targets = {}  # Note -> {link key: resolved note or None}
+        self.referrers = {}  # Link key -> notes that use it
+        self.backlinks = {}  # Note -> {linking note: number of its links that resolve here}
+        self.touched = {}  # (source, target) -> linked before the current change
+
+    def clear(self):
+        for index in (self.by_name, self.by_suffix, self.by_alias, self.aliases_by_note,
+                      self.targets, self.referrers, self.backlinks):
+            index.clear()
+
+    @staticmethod
+    def link_key(link):
+        return link.replace("\\", "/").strip("/").casefold()
+
+    @staticmethod
+    def name_keys(path):
+        """(file name key, path ending keys) a note can be linked by."""
+        parts = path[:-3].casefold().split("/") if path.endswith(".md") else path.casefold().split("/")
+        return parts[-1], ["/".join(parts[i:]) for i in range(len(parts) - 1)]
+
+    def links_to(self, source, target):
+        return self.backlinks.get(target, {}).get(source, 0) > 0
+
+    def set_note(self, path, links, aliases=()):
+        """Add or update a note; returns the (added, removed) links this changes."""
+        affected = set()
+        if path not in self.targets:
+            self.targets[path] = {}
+            name, suffixes = self.name_keys(path)
+            self.by_name.setdefault(name, set()).add(path)
+            for key in suffixes:
+                self.by_suffix.setdefault(key, set()).add(path)
+            affected.add(name)
+            affected.update(suffixes)
+
+        aliases = {self.link_key(alias) for alias in aliases}
+        old_aliases = self.aliases_by_note.get(path, set())
+        for key in old_aliases - aliases:
+            self.discard(self.by_alias, key, path)
+        for key in aliases - old_aliases:
+            self.by_alias.setdefault(key, set()).add(path)
+        self.aliases_by_note[path] = aliases
+        affected.update(aliases ^ old_aliases)
+
+        keys = {self.link_key(link) for link in links}
+        targets = self.targets[path]
+        for key in set(targets) - keys:
+            self.retarget(path, key, None)
+            del targets[key]
+            self.discard(self.referrers, key, path)
+        for key in keys - set(targets):
+            self.referrers.setdefault(key, set()).add(path)
+            targets[key] = None
+            self.retarget(path, key, self.resolve(path, key))
+
+        self.reresolve(affected)
+        return self.delta()
+
+    def remove_note(self, path):
+        """Forget a note and its links; returns the (added, removed) links this changes."""
+        if path not in self.targets:
+            return [], []
+        for key in list(self.targets[path]):
+            self.retarget(path, key, None)
+            self.discard(self.referrers, key, path)
+        del self.targets[path]
+
+        name, suffixes = self.name_keys(path)
+        self.discard(self.by_name, name, path)
+        for key in suffixes:
+            self.discard(self.by_suffix, key, path)
+        aliases = self.aliases_by_note.pop(path, set())
+        for key in aliases:
+            self.discard(self.by_alias, key, path)
+        self.reresolve({name, *suffixes, *aliases})
+        return self.delta()
+
+    def resolve(self, source, key):
+        """The note ``key`` (a link in ``source``) points to, or None."""
+        if "/" in key:
+            candidates = self.by_suffix.get(key)
+        else:
+            candidates = self.by_name.get(key) or self.by_alias.get(key)
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return next(iter(candidates))
+        folder = source.rpartition("/")[0]
+        return min(candidates, key=lambda path: (path.rpartition("/")[0] != folder, path.count("/"), path))
+
+    def reresolve(self, keys):
+        for key in keys:
+            for source in self.referrers.get(key, ()):
+                self.retarget(source, key, self.resolve(source, key))
+
+    def retarget(self, source, key, target):
+        targets = self.targets[source]
+        old = targets[key]
+        if old == target:
+            return
+        if old is not None:
+            self.touched.setdefault((source, old), True)
+            counts = self.backlinks[old]
+            counts[source] -= 1
+            if not counts[source]:
+                del counts[source]
+                if not counts:
+                    del self.backlinks[old]
+        if target is not None:
+            self.touched.setdefault((source, target), self.links_to(source, target))
+            counts = self.backlinks.setdefault(target, {})
+            counts[source] = counts.get(source, 0) + 1
+        targets[key] = target
+
+    def delta(self):
+        added, removed = [], []
+        for (source, target), before in self.touched.items():
+            after = self.links_to(source, target)
+            if after and not before:
+                added.append((source, target))
+            elif before and not after:
+                removed.append((source, target))
+        self.touched.clear()
+        return added, removed
+
+    @staticmethod
+    def discard(index, key, path):
+        paths = index.get(key)
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del index[key]
+
+
+class VaultChangeHandler:
+    """Collects watchdog events and hands them to the app in batches.
+
+    Paths are deduplicated while events keep arriving; once the vault has
+    been quiet for ``quiet_window`` seconds (or ``max_delay`` has passed
+    since the first pending event) the whole batch is applied at once.
+    After ``cancel()`` no batch is applied any more, including one that
+    was already being parsed when it was called.
+    """
+
+    def __init__(self, app, quiet_window=CHANGE_QUIET_WINDOW, max_delay=CHANGE_MAX_DELAY):
         self.app = app
+        self.quiet_window = quiet_window
+        self.max_delay = max_delay
+        self.pending = {}  # path -> None, keeps first-seen order
+        self.first_event = None
+        self.timer = None
+        self.stopped = False
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # Held while a batch is parsed and written to the cache
+
+    def dispatch(self, event):
+        """Entry point for the watchdog observer (as in FileSystemEventHandler)."""
+        handler = getattr(self, f"on_{event.event_type}", None)
+        if handler:
+            handler(event)
 
     def on_modified(self, event):
         if event.is_directory or not event.src_path.endswith(".md"):
             return
-        self.app.handle_file_change(event.src_path)
+        self.queue(event.src_path)
 
     def on_created(self, event):
         if event.is_directory or not event.src_path.endswith(".md"):
             return
-        self.app.handle_file_change(event.src_path)
+        self.queue(event.src_path)
     
     def on_deleted(self, event):
         if event.is_directory or not event.src_path.endswith(".md"):
             return
-        self.app.handle_file_change(event.src_path)
+        self.queue(event.src_path)
         
     def on_moved(self, event):
-        if event.is_directory or not event.src_path.endswith(".md"):
+        if event.is_directory:
             return
-        self.app.handle_file_change(event.src_path)
+        if event.src_path.endswith(".md"):
+            self.queue(event.src_path)
+        if event.dest_path.endswith(".md"):
+            self.queue(event.dest_path)
+
+    def queue(self, path):
+        with self.lock:
+            if self.stopped:
+                return
+            now = time.monotonic()
+            if not self.pending:
+                self.first_event = now
+            self.pending[path] = None
+
+            if self.timer:
+                self.timer.cancel()
+            delay = min(self.quiet_window, self.first_event + self.max_delay - now)
+            self.timer = threading.Timer(max(delay, 0), self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                if self.stopped:
+                    return
+                paths = list(self.pending)
+                first_event = self.first_event
+                self.pending.clear()
+                self.timer = None
+            if paths:
+                self.app.handle_file_changes(paths, first_event)
+
+    def cancel(self):
+        """Drop pending events and wait for a batch that is being applied right now."""
+        with self.lock:
+            self.stopped = True
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            self.pending.clear()
+        with self.flush_lock:
+            pass  # The cache may be closed once this returns
+
+
+VaultLoadProgress = namedtuple(
+    "VaultLoadProgress", "files total_files bytes total_bytes elapsed eta"
+)  # Totals and eta are None until the whole vault has been listed
+
+
+class VaultLoader:
+    """Reads a vault on a background thread and hands it over in batches.
+
+    The thread scans, parses (through the app's cache and scan pool),
+    works out the nodes and edges of each chunk of notes (resolving links
+    through the app's LinkIndex, which it owns while loading) and lays the
+    chunk out around the nodes placed before it. It then emits the batch
+    and the new positions with ``app.vault_batch``; only the GUI thread
+    touches the graph, and it only has to create items. Progress goes out
+    with ``app.vault_progress`` and the end of the job with
+    ``app.vault_loaded``. Every signal carries the loader, so batches of a
+    cancelled job can be told apart from the current one.
+
+    A batch is only sent once the GUI has shown the previous one (it sets
+    ``drained``), so the event queue never fills up with batches while the
+    next chunk is already being parsed and laid out.
+
+    ``batches()`` is the same work without the layout as a plain generator,
+    for synchronous builds.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.vault_path = app.vault_path
+        self.cancelled = threading.Event()
+        self.drained = threading.Event()
+        self.drained.set()
+        self.started = time.perf_counter()
+        self.files = 0
+        self.bytes = 0
+        self.total_files = None
+        self.total_bytes = None
+        self.reported = 0.0  # perf_counter() of the last progress update
+        self.thread = None
+        self.busy = threading.Lock()  # Held while the thread uses the app's cache, scan pool or LinkIndex
+        self.known = {}  # Node name -> position: the saved layout plus every chunk laid out so far
+        self.restored = frozenset()
+
+    def start(self):
+        viewer = self.app.graph_viewer
+        self.known = dict(viewer.saved_positions)
+        self.restored = frozenset(viewer.restored_nodes)
+        self.thread = threading.Thread(target=self.run, name="vault-loader", daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """Stop after the file slice being parsed; waits until the thread is done with the app's state.
+
+        A chunk layout that is still running finishes in the background
+        and is dropped.
+        """
+        self.cancelled.set()
+        self.drained.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            with self.busy:
+                pass
+
+    def run(self):
+        completed = False
+        try:
+            for batch in self.batches():
+                positions = self.layout(*batch)
+                self.drained.wait()
+                if self.cancelled.is_set():
+                    break
+                self.drained.clear()
+                self.app.vault_batch.emit(self, batch, positions)
+            self.drained.wait()
+            completed = not self.cancelled.is_set()
+        except Exception as e:  # Keep the app usable with whatever was loaded
+            print(f"[WARN] Vault loading failed: {e}")
+        self.app.vault_loaded.emit(self, completed)
+
+    def progress(self):
+        elapsed = time.perf_counter() - self.started
+        eta = None
+        if self.total_bytes is not None and self.bytes:
+            eta = elapsed * (self.total_bytes - self.bytes) / self.bytes
+        return VaultLoadProgress(self.files, self.total_files, self.bytes, self.total_bytes, elapsed, eta)
+
+    def batches(self):
+        """Yield plan() of every chunk: (notes, tag edges, link changes).
+
+        The first VAULT_LOAD_FIRST_CHUNK notes are parsed before the rest of
+        the vault is listed so they can be shown quickly; chunks then double.
+        """
+        if not self.vault_path:
+            return
+        walker = walk_vault(self.vault_path)
+        with PERF.measure("scan"):
+            chunk = list(islice(walker, VAULT_LOAD_FIRST_CHUNK))
+        rest = None
+        scanned = []
+        # Parse in slices that keep every scan worker busy, checking for cancellation in between
+        step = SCAN_CHUNK_SIZE * (self.app.scan_workers or os.cpu_count() or 1)
+
+        while chunk:
+            scanned.extend(rel_path for rel_path, _, _ in chunk)
+            metadata = []
+            for i in range(0, len(chunk), step):
+                notes = chunk[i:i + step]
+                with self.busy:
+                    if self.cancelled.is_set():
+                        return
+                    with PERF.measure("parse", files=len(notes)):
+                        metadata.extend(self.app.load_notes(notes))
+                self.files += len(notes)
+                self.bytes += sum(stat.st_size for _, _, stat in notes)
+                if self.thread is not None and time.perf_counter() - self.reported >= VAULT_PROGRESS_INTERVAL:
+                    self.reported = time.perf_counter()
+                    self.app.vault_progress.emit(self, self.progress())
+            with self.busy:
+                if self.cancelled.is_set():
+                    return
+                batch = self.plan(chunk, metadata)
+            yield batch
+
+            if rest is None:
+                rest = []
+                with PERF.measure("scan"):
+                    for note in walker:
+                        if self.cancelled.is_set():
+                            return
+                        rest.append(note)
+                self.total_files = self.files + len(rest)
+                self.total_bytes = self.bytes + sum(stat.st_size for _, _, stat in rest)
+            size = max(VAULT_LOAD_FIRST_CHUNK, self.files)
+            chunk, rest = rest[:size], rest[size:]
+
+        with self.busy:
+            if self.app.metadata_cache and not self.cancelled.is_set():
+                self.app.metadata_cache.prune(scanned)
+                self.app.metadata_cache.commit()
+
+    def plan(self, chunk, metadata):
+        """Notes a chunk adds, the edges to their tags and the links they change.
+
+        Links are resolved through the app's LinkIndex, against every note
+        loaded so far. Link changes are (note, note, linked) for each pair
+        of notes whose link edge the chunk may add or remove, including
+        earlier links that only now resolve or found a better match.
+        """
+        notes, edges = [], []
+        for (rel_path, _, _), (tags, links, aliases) in zip(chunk, metadata):
+            note = note_name(rel_path)
+            notes.append((note, tags, links, aliases))
+            # Add tag relations
+            for tag in tags:
+                edges.append((tag, note))
+                edges.append((f"#{tag}", note))
+
+        link_index, pairs = self.app.link_index, {}
+        for note, _, links, aliases in notes:
+            added, removed = link_index.set_note(note, links, aliases)
+            for source, target in added + removed:
+                if source != target and (target, source) not in pairs:
+                    pairs[(source, target)] = None
+        # A link edge stays while either note still links to the other
+        links = [
+            (source, target, link_index.links_to(source, target) or link_index.links_to(target, source))
+            for source, target in pairs
+        ]
+        return notes, edges, links
+
+    def layout(self, notes, edges, links):
+        """Positions for the nodes a batch adds, laid out around the nodes placed before it."""
+        graph = VaultGraph(
+            (note for note, *_ in notes),
+            edges + [(source, target) for source, target, linked in links if linked],
+        )
+        known = {node: self.known[node] for node in graph if node in self.known}
+        if len(known) == graph.number_of_nodes():
+            return {}
+        with PERF.measure("layout", nodes=graph.number_of_nodes() - len(known)):
+            positions, _ = self.app.graph_viewer.layout_graph(graph, known, self.restored)
+        positions = {node: xy for node, xy in positions.items() if node not in known}
+        self.known.update(positions)
+        return positions
+
 
 class InteractiveNode(QGraphicsEllipseItem):
     def __init__(self, name, graph_viewer, x, y):
         super().__init__(-5, -5, 10, 10)
         self.name = name
         self.graph_viewer = graph_viewer
-        self.setBrush(QBrush(QColor("#8e44ad")))
+        self.setBrush(QBrush(QColor(NODE_COLOR)))
         self.setAcceptHoverEvents(True)
+        self.setToolTip(name)
         self.setFlag(QGraphicsEllipseItem.GraphicsItemFlag.ItemIsMovable)
 
-        self.edges = []
-        self.velocity = [random.uniform(-1, 1), random.uniform(-1, 1)]
+        self.index = None  # Node id in the viewer's GraphModel
         self.dragging = False
         self.setPos(x, y)
 
         # 🌟 Create the text label
-        self.label = QGraphicsTextItem(name)
+        self.label = QGraphicsTextItem(node_label(name))
         self.label.setDefaultTextColor(QColor("#dcdcdc"))
         self.label.setZValue(2)  # Keep text above nodes
         graph_viewer.scene.addItem(self.label)
@@ -104,14 +1241,755 @@ class InteractiveNode(QGraphicsEllipseItem):
         super().setY(y)
         self.update_label_position()
 
+    def move_to(self, x, y):
+        """Move node and label in one go (used when syncing from the simulation)."""
+        self.setPos(x, y)
+        self.label.setPos(x + 12, y - 8)
+
+    def mousePressEvent(self, event):
+        self.dragging = True
+        self.graph_viewer.pin_node(self, True)
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        self.update_label_position()
+        self.graph_viewer.move_node(self, self.x(), self.y())
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        self.graph_viewer.release_node(self, event)
+
+
+def scatter_add(target, index, values):
+    """Add rows of ``values`` into ``target[index]``, summing duplicate indices."""
+    n = len(target)
+    target[:, 0] += np.bincount(index, weights=values[:, 0], minlength=n)
+    target[:, 1] += np.bincount(index, weights=values[:, 1], minlength=n)
+
+
+def cell_keys(cx, cy):
+    """Pack integer grid coordinates into a single sortable int64 key."""
+    return cx * (1 << 32) + (cy + (1 << 31))
+
+
+def spread_bits(values):
+    """Insert a zero bit between each of the low 16 bits (for Morton codes)."""
+    values = values & 0xFFFF
+    values = (values | (values << 8)) & 0x00FF00FF
+    values = (values | (values << 4)) & 0x0F0F0F0F
+    values = (values | (values << 2)) & 0x33333333
+    values = (values | (values << 1)) & 0x55555555
+    return values
+
+
+class QuadTree:
+    """Barnes–Hut quadtree stored level by level as flat NumPy arrays.
+
+    Every node gets a Morton code on a ``2**depth`` grid; a cell at ``level``
+    is a code prefix, so each level only needs its sorted codes, point count
+    and centre of mass.
+    """
+
+    def __init__(self, positions, depth=QUADTREE_DEPTH):
+        self.depth = depth
+        low = positions.min(axis=0)
+        self.size = max(float((positions.max(axis=0) - low).max()), 1e-6) * 1.000001
+
+        grid = ((positions - low) / self.size * (1 << depth)).astype(np.int64)
+        grid = np.clip(grid, 0, (1 << depth) - 1)
+        morton = spread_bits(grid[:, 0]) | (spread_bits(grid[:, 1]) << 1)
+
+        self.codes, self.counts, self.centers, self.node_cells = [], [], [], []
+        for level in range(depth + 1):
+            codes, cell_of_node, counts = np.unique(
+                morton >> (2 * (depth - level)), return_inverse=True, return_counts=True
+            )
+            centers = np.column_stack([
+                np.bincount(cell_of_node, weights=positions[:, 0]),
+                np.bincount(cell_of_node, weights=positions[:, 1]),
+            ]) / counts[:, None]
+            self.codes.append(codes)
+            self.counts.append(counts)
+            self.centers.append(centers)
+            self.node_cells.append(cell_of_node)
+
+    def cell_size(self, level):
+        return self.size / (1 << level)
+
+    def children(self, level, cells):
+        """Return (parent position, child cell) pairs for ``cells`` at ``level``."""
+        codes = self.codes[level][cells] << 2
+        child_codes = self.codes[level + 1]
+        first = np.searchsorted(child_codes, codes)
+        run = np.searchsorted(child_codes, codes + 4) - first
+
+        parent = np.repeat(np.arange(len(cells)), run)
+        offset = np.arange(run.sum()) - np.repeat(np.cumsum(run) - run, run)
+        return parent, np.repeat(first, run) + offset
+
+
+class GraphModel:
+    """Integer-indexed snapshot of the graph shown in the viewer.
+
+    Node ``i`` is ``names[i]``; edge ``e`` joins ``edges[e, 0]`` and
+    ``edges[e, 1]``. The edges touching node ``i`` are
+    ``incident_edges[incident_offsets[i]:incident_offsets[i + 1]]``.
+    """
+
+    def __init__(self, names, edges=(), edge_ids=None):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        if edge_ids is None:
+            edge_ids = [(self.index[u], self.index[v]) for u, v in edges]
+        self.edges = np.asarray(edge_ids, dtype=np.intp).reshape(-1, 2)
+
+        ends = self.edges.ravel()
+        order = np.argsort(ends, kind="stable")
+        self.incident_edges = (order // 2).astype(np.intp)
+        degree = np.bincount(ends, minlength=len(self.names))
+        self.incident_offsets = np.concatenate([[0], np.cumsum(degree)])
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Model of a VaultGraph, with edges in the order of ``graph.edges``."""
+        ids = np.fromiter(graph.index.values(), dtype=np.intp, count=len(graph))
+        remap = np.zeros(len(graph.names), dtype=np.intp)
+        remap[ids] = np.arange(len(ids))  # Drops the free ids
+        return cls(graph.index, edge_ids=remap[graph.coo()])
+
+    def __len__(self):
+        return len(self.names)
+
+    def incident(self, node_id):
+        """Edge ids touching ``node_id``."""
+        return self.incident_edges[self.incident_offsets[node_id]:self.incident_offsets[node_id + 1]]
+
+
+class ForceSimulation:
+    """Force layout state kept in contiguous NumPy arrays.
+
+    Rows of ``positions``/``velocities`` are nodes, rows of ``edges`` are
+    index pairs with a matching rest length in ``rest_lengths``.
+    """
+
+    def __init__(self, positions, edges, rest_lengths):
+        self.positions = np.array(positions, dtype=np.float64).reshape(-1, 2)
+        self.velocities = np.random.uniform(-1, 1, self.positions.shape)
+        self.edges = np.array(edges, dtype=np.intp).reshape(-1, 2)
+        self.rest_lengths = np.array(rest_lengths, dtype=np.float64)
+        self.pinned = np.zeros(len(self.positions), dtype=bool)
+
+        # Share of each spring's pull taken by the target end, d3-style: the
+        # busier end moves less, so a tag hub is not yanked by all its notes at once
+        degree = np.bincount(self.edges.ravel(), minlength=len(self.positions))
+        source_degree, target_degree = degree[self.edges[:, 0]], degree[self.edges[:, 1]]
+        self.spring_bias = source_degree / np.maximum(source_degree + target_degree, 1)
+
+        self.spring_strength = 0.005
+        self.repel_strength = 1000
+        self.repel_cutoff = 50
+        self.damping = 0.9
+        self.max_speed = None  # Per-tick distance cap, for layouts started from a crowded state
+
+        # "cutoff" only repels within repel_cutoff, "barnes_hut" is a
+        # long-range charge model scaled by repel_force.
+        self.repulsion_mode = "cutoff"
+        self.repel_force = 1.0
+        self.theta = 0.9
+        self.center_force = 0.0
+
+        # Cooling: forces are scaled by alpha, which decays towards
+        # alpha_target every tick (kept above zero while dragging).
+        self.alpha = 1.0
+        self.alpha_target = 0.0
+        self.alpha_decay = ALPHA_DECAY
+        self.kinetic_energy = 0.0
+
+    def step(self):
+        """Advance the simulation by one tick; returns False once it is at rest."""
+        if not len(self.positions):
+            return False
+        self.alpha += (self.alpha_target - self.alpha) * self.alpha_decay
+
+        forces = np.zeros_like(self.positions)
+        self.apply_springs(forces)
+        if self.repulsion_mode == "barnes_hut":
+            self.apply_many_body(forces)
+        else:
+            self.apply_repulsion(forces)
+        self.apply_center(forces)
+
+        self.velocities = (self.velocities + forces * self.alpha) * self.damping
+        if self.max_speed:
+            speed = np.hypot(self.velocities[:, 0], self.velocities[:, 1])
+            self.velocities *= np.minimum(1.0, self.max_speed / np.maximum(speed, 1e-12))[:, None]
+        self.velocities[self.pinned] = 0
+        self.positions += self.velocities
+
+        self.kinetic_energy = float(np.einsum("ij,ij->", self.velocities, self.velocities)) / len(self.velocities)
+        return not self.at_rest()
+
+    def at_rest(self):
+        if self.alpha_target > 0:
+            return False
+        return self.alpha < ALPHA_MIN or self.kinetic_energy < REST_ENERGY
+
+    def reheat(self, alpha=REHEAT_ALPHA):
+        self.alpha = max(self.alpha, alpha)
+
+    def configure(self, **parameters):
+        for name, value in parameters.items():
+            setattr(self, name, value)
+
+    def pin(self, index, pinned):
+        """Hold a node in place; the layout stays warm while anything is pinned."""
+        self.pinned[index] = pinned
+        self.alpha_target = REHEAT_ALPHA if self.pinned.any() else 0.0
+        self.reheat()
+
+    def move(self, index, x, y):
+        self.positions[index] = (x, y)
+
+    def apply_springs(self, forces):
+        """Pull linked nodes towards their preferred link distance."""
+        if not len(self.edges):
+            return
+        source, target = self.edges[:, 0], self.edges[:, 1]
+        delta = self.positions[target] - self.positions[source]
+        distance = np.hypot(delta[:, 0], delta[:, 1])
+        distance[distance == 0] = 0.1
+
+        # Each end gets its share of twice the pull, so equally busy ends pull as plainly summed springs
+        force = (distance - self.rest_lengths) * (2 * self.spring_strength)
+        pull = delta * (force / distance)[:, None]
+        scatter_add(forces, source, pull * (1 - self.spring_bias)[:, None])
+        scatter_add(forces, target, -pull * self.spring_bias[:, None])
+
+    def apply_repulsion(self, forces):
+        """Push apart nodes closer than ``repel_cutoff``.
+
+        Nodes are binned into a uniform grid whose cell size equals the cutoff,
+        rebuilt every tick, so each node only tests the 3x3 block of cells
+        around its own.
+        """
+        positions = self.positions
+        cells = np.floor(positions / self.repel_cutoff).astype(np.int64)
+        keys = cell_keys(cells[:, 0], cells[:, 1])
+
+        order = np.argsort(keys, kind="stable")
+        cell_ids, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+        for ox in (-1, 0, 1):
+            for oy in (-1, 0, 1):
+                wanted = cell_keys(cells[:, 0] + ox, cells[:, 1] + oy)
+                slot = np.minimum(np.searchsorted(cell_ids, wanted), len(cell_ids) - 1)
+                found = cell_ids[slot] == wanted
+                if not found.any():
+                    continue
+
+                nodes = np.nonzero(found)[0]
+                slot = slot[found]
+                run = counts[slot]
+                ends = np.cumsum(run)
+                # Crowded cells make O(occupancy²) pairs, so build them a block of nodes at a time
+                block = 0
+                while block < len(nodes):
+                    stop = np.searchsorted(ends, ends[block] - run[block] + REPULSION_BLOCK_PAIRS, side="right")
+                    stop = max(int(stop), block + 1)
+                    self.repel_cells(forces, nodes[block:stop], order, starts[slot[block:stop]], run[block:stop])
+                    block = stop
+
+    def repel_cells(self, forces, nodes, order, first, run):
+        """Repel each of ``nodes`` from the ``run`` nodes of its cell, found at ``order[first:first + run]``."""
+        offset = np.arange(run.sum()) - np.repeat(np.cumsum(run) - run, run)
+        i = np.repeat(nodes, run)
+        j = order[np.repeat(first, run) + offset]
+        self.repel_pairs(forces, i, j)
+
+    def repel_pairs(self, forces, i, j):
+        """Apply the cutoff repulsion of node ``j`` onto node ``i`` for each pair."""
+        delta = self.positions[j] - self.positions[i]
+        distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), REPULSION_MIN_DISTANCE)
+        close = (distance < self.repel_cutoff) & (i != j)
+        if not close.any():
+            return
+
+        push = delta[close] * (self.repel_strength / distance[close]**3)[:, None]
+        scatter_add(forces, i[close], -push)
+
+    def apply_many_body(self, forces):
+        """Long-range repulsion from every node, approximated with Barnes–Hut.
+
+        A cell whose size/distance ratio is below ``theta`` acts as a single
+        charge at its centre of mass; otherwise it is opened. Cells holding
+        the node itself are always opened, and leaves holding only it are
+        skipped.
+        """
+        positions = self.positions
+        tree = QuadTree(positions)
+        strength = self.repel_strength * self.repel_force
+
+        nodes = np.arange(len(positions))
+        cells = np.zeros(len(positions), dtype=np.intp)
+        for level in range(tree.depth + 1):
+            delta = tree.centers[level][cells] - positions[nodes]
+            distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), REPULSION_MIN_DISTANCE)
+            mass = tree.counts[level][cells]
+
+            own = tree.node_cells[level][nodes] == cells
+            leaf = (mass == 1) | (level == tree.depth)
+            far = tree.cell_size(level) / distance < self.theta
+            apply = ~own & (far | leaf)
+
+            push = delta[apply] * (strength * mass[apply] / distance[apply]**3)[:, None]
+            scatter_add(forces, nodes[apply], -push)
+
+            opened = ~apply & ~leaf
+            if not opened.any():
+                break
+            parent, cells = tree.children(level, cells[opened])
+            nodes = nodes[opened][parent]
+
+    def apply_center(self, forces):
+        """Pull every node towards the origin, proportional to its distance."""
+        if self.center_force:
+            forces -= self.positions * (self.center_force * CENTER_FORCE_SCALE)
+
+
+def coarsen(edges, mass, rng):
+    """Collapse a graph to roughly half its size; returns (parent of each node, coarse size).
+
+    Nodes are paired up in a few handshake rounds: every unpaired node
+    proposes to its lightest unpaired neighbour (ties broken at random) and
+    mutual proposals become a pair. Nodes left over afterwards join their
+    lightest neighbour's pair, so the leaves of a star collapse into the hub
+    in one level.
+    """
+    n = len(mass)
+    nodes = np.arange(n)
+    parent = np.full(n, -1, dtype=np.intp)
+    next_id = 0
+    source = np.concatenate([edges[:, 0], edges[:, 1]])
+    target = np.concatenate([edges[:, 1], edges[:, 0]])
+
+    def proposals(usable):
+        s, t = source[usable], target[usable]
+        order = np.lexsort((mass[t] + rng.random(len(t)), s))
+        s, t = s[order], t[order]
+        first = np.concatenate([[True], s[1:] != s[:-1]])
+        proposal = np.full(n, -1, dtype=np.intp)
+        proposal[s[first]] = t[first]
+        return proposal
+
+    for _ in range(MULTILEVEL_MATCH_ROUNDS):
+        free = parent < 0
+        usable = free[source] & free[target]
+        if not usable.any():
+            break
+        proposal = proposals(usable)
+        leader = (proposal > nodes) & (proposal[np.maximum(proposal, 0)] == nodes)
+        pair_ids = next_id + np.arange(leader.sum())
+        parent[nodes[leader]] = pair_ids
+        parent[proposal[leader]] = pair_ids
+        next_id += len(pair_ids)
+
+    usable = (parent[source] < 0) & (parent[target] >= 0)
+    if usable.any():
+        proposal = proposals(usable)
+        joins = proposal >= 0
+        parent[joins] = parent[proposal[joins]]
+
+    single = parent < 0
+    parent[single] = next_id + np.arange(single.sum())
+    return parent, int(next_id + single.sum())
+
+
+def multilevel_layout(edges, rest_lengths, n, fixed=None, seed=None, **parameters):
+    """Initial positions for a large graph, laid out coarse to fine (sfdp/FM³ style).
+
+    The graph is coarsened with ``coarsen`` until it is tiny, the coarsest
+    level is laid out with the Barnes–Hut force model, and every finer level
+    starts from its parent's position (plus a little jitter) and is refined
+    with a short ForceSimulation run. ``fixed`` maps node ids to positions
+    that are kept: on every level a cluster holding fixed nodes starts at
+    their mean and is pinned if it holds nothing else, so the free nodes
+    are laid out around the fixed ones. ``parameters`` configure each
+    ForceSimulation, as GraphViewer.force_parameters() does.
+
+    It trades layout quality for speed: neighbourhoods are kept together
+    less faithfully than by spring_layout (see the benchmark's
+    distance_correlation), and the live simulation keeps refining the
+    result after the first draw.
+    """
+    rng = np.random.default_rng(seed)
+    edges = np.asarray(edges, dtype=np.intp).reshape(-1, 2)
+    rest_lengths = np.asarray(rest_lengths, dtype=np.float64)
+    mean_rest = float(rest_lengths.mean()) if len(rest_lengths) else 100.0
+
+    def cluster_rest_lengths(edges, rest_lengths, mass):
+        # A coarse edge joins two clusters, so it grows with their size
+        return rest_lengths * (mass[edges[:, 0]] ** 0.25 + mass[edges[:, 1]] ** 0.25) / 2
+
+    # Sum and count of the fixed positions inside each node, carried down every level
+    fixed_sum = np.zeros((n, 2))
+    fixed_count = np.zeros(n)
+    if fixed:
+        ids = np.fromiter(fixed.keys(), dtype=np.intp, count=len(fixed))
+        fixed_sum[ids] = np.array(list(fixed.values()), dtype=np.float64).reshape(-1, 2)
+        fixed_count[ids] = 1
+
+    # Coarsen, remembering each level's edges, rest lengths, masses, fixed nodes and parent map
+    levels = []
+    mass = np.ones(n)
+    while n > MULTILEVEL_COARSEST:
+        parent, coarse_n = coarsen(edges, mass, rng)
+        if coarse_n > 0.9 * n:
+            break  # Nothing left to merge (e.g. many isolated nodes)
+        levels.append((edges, cluster_rest_lengths(edges, rest_lengths, mass), mass, fixed_sum, fixed_count, parent))
+
+        ends = parent[edges]
+        keep = ends[:, 0] != ends[:, 1]
+        ends = np.sort(ends[keep], axis=1)
+        key = ends[:, 0].astype(np.int64) * coarse_n + ends[:, 1]
+        unique_keys, edge_of = np.unique(key, return_inverse=True)
+        merged_mass = np.bincount(parent, weights=mass, minlength=coarse_n)
+        edges = np.column_stack([unique_keys // coarse_n, unique_keys % coarse_n]).astype(np.intp)
+        rest_lengths = np.bincount(edge_of, weights=rest_lengths[keep]) / np.bincount(edge_of)
+        fixed_sum = np.column_stack([
+            np.bincount(parent, weights=fixed_sum[:, 0], minlength=coarse_n),
+            np.bincount(parent, weights=fixed_sum[:, 1], minlength=coarse_n),
+        ])
+        fixed_count = np.bincount(parent, weights=fixed_count, minlength=coarse_n)
+        mass, n = merged_mass, coarse_n
+
+    def anchor(positions, mass, fixed_sum, fixed_count):
+        """Move clusters holding fixed nodes to their mean; returns the wholly fixed ones to pin."""
+        anchored = fixed_count > 0
+        positions[anchored] = fixed_sum[anchored] / fixed_count[anchored, None]
+        return fixed_count == mass
+
+    positions = rng.uniform(-1, 1, (n, 2)) * mean_rest * np.sqrt(mass.sum())
+    pinned = anchor(positions, mass, fixed_sum, fixed_count)
+    positions = refine(positions, edges, cluster_rest_lengths(edges, rest_lengths, mass), parameters, pinned)
+
+    for edges, rest_lengths, mass, fixed_sum, fixed_count, parent in reversed(levels):
+        # Children start around their cluster's centre, spread by the cluster size
+        spread = mean_rest * 0.2 * np.sqrt(np.bincount(parent)[parent])
+        positions = positions[parent] + rng.uniform(-1, 1, (len(parent), 2)) * spread[:, None]
+        pinned = anchor(positions, mass, fixed_sum, fixed_count)
+        positions = refine(positions, edges, rest_lengths, parameters, pinned)
+    if not fixed:
+        positions -= positions.mean(axis=0)
+    return positions
+
+
+def refine(positions, edges, rest_lengths, parameters, pinned=None):
+    """Cool a level from ``positions`` with Barnes–Hut steps, fewer the larger it is."""
+    iterations = int(np.clip(MULTILEVEL_STEP_BUDGET / max(len(positions), 1),
+                             MULTILEVEL_MIN_ITERATIONS, MULTILEVEL_ITERATIONS))
+    simulation = ForceSimulation(positions, edges, rest_lengths)
+    simulation.configure(**parameters)
+    simulation.repulsion_mode = "barnes_hut"  # Only long-range repulsion untangles a level
+    simulation.velocities[:] = 0
+    simulation.alpha_decay = 1 - ALPHA_MIN ** (1 / iterations)
+    simulation.max_speed = float(np.median(rest_lengths)) if len(rest_lengths) else None
+    if pinned is not None:
+        simulation.pinned = pinned
+    for _ in range(iterations):
+        simulation.step()
+    return simulation.positions
+
+
+def point_polygon(points):
+    """QPolygonF over an (n, 2) float array, filled through its buffer instead of per point."""
+    polygon = QPolygonF()
+    if len(points):
+        points = np.ascontiguousarray(points, dtype=np.float64)
+        polygon.resize(len(points))
+        buffer = polygon.data()
+        buffer.setsize(points.nbytes)
+        np.frombuffer(buffer, dtype=np.float64)[:] = points.ravel()
+    return polygon
+
+
+class PaintedNode:
+    """Node record used by the batched renderer instead of an InteractiveNode."""
+
+    def __init__(self, name):
+        self.name = name
+        self.index = None
+        self.dragging = False
+
+
+class GraphPainterItem(QGraphicsItem):
+    """Draws the whole graph as one scene item, straight from the position arrays.
+
+    Edges go out in a single ``drawLines`` call and nodes in a single
+    ``drawPoints`` call with a round pen as wide as a node, using the
+    viewer's visibility masks for culling and level of detail. Hover,
+    tooltips and dragging are handled by hit-testing the position array
+    instead of per-node items.
+    """
+
+    def __init__(self, viewer):
+        super().__init__()
+        self.viewer = viewer
+        self.rect = QRectF()
+        self.hovered = None
+        self.held = None
+        self.setAcceptHoverEvents(True)
+
+    def boundingRect(self):
+        return self.rect
+
+    def refresh(self):
+        """Grow/shrink to the current layout and schedule a repaint."""
+        positions = self.viewer.positions
+        if len(positions):
+            (left, top), (right, bottom) = positions.min(axis=0), positions.max(axis=0)
+            # Room for the node radius and the labels to the right of nodes
+            rect = QRectF(left - 20, top - 20, right - left + 220, bottom - top + 40)
+        else:
+            rect = QRectF()
+        if rect != self.rect:
+            self.prepareGeometryChange()
+            self.rect = rect
+        self.update()
+
+    def paint(self, painter, option, widget=None):
+        viewer = self.viewer
+        if viewer.model is None or not len(viewer.positions):
+            return
+        positions = viewer.positions
+        nodes, labels, edges = viewer.visible_items()
+        highlighted = self.highlighted_edges()
+        faded_nodes, faded_edges = viewer.faded_items()
+
+        # Whatever a "dim" filter leaves out goes first, underneath
+        painter.setOpacity(FILTER_DIM_OPACITY)
+        self.draw_layer(painter, nodes & faded_nodes, labels & faded_nodes, edges & faded_edges & ~highlighted)
+        painter.setOpacity(1.0)
+        self.draw_layer(painter, nodes & ~faded_nodes, labels & ~faded_nodes, edges & ~faded_edges & ~highlighted)
+
+        if highlighted.any():
+            endpoints = positions[viewer.model.edges[highlighted]].reshape(-1, 4)
+            painter.setPen(QPen(QColor(HIGHLIGHT_COLOR), 2))
+            painter.drawLines([QLineF(*line) for line in endpoints.tolist()])
+        if self.hovered is not None:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QBrush(QColor(HIGHLIGHT_COLOR)))
+            painter.drawEllipse(QPointF(*positions[self.hovered]), NODE_RADIUS + 1, NODE_RADIUS + 1)
+
+    def draw_layer(self, painter, nodes, labels, edges):
+        """Draw the masked edges, nodes and labels with the painter's current opacity."""
+        viewer = self.viewer
+        positions = viewer.positions
+        endpoints = positions[viewer.model.edges[edges]].reshape(-1, 4)
+        painter.setPen(QPen(Qt.GlobalColor.gray, 1))
+        painter.drawLines([QLineF(*line) for line in endpoints.tolist()])
+
+        node_pen = QPen(QColor(NODE_COLOR), 2 * NODE_RADIUS)
+        node_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        painter.setPen(node_pen)
+        painter.drawPoints(point_polygon(positions[nodes]))
+
+        painter.setPen(QColor(LABEL_COLOR))
+        shown = np.flatnonzero(labels)
+        for index, (x, y) in zip(shown.tolist(), positions[shown].tolist()):
+            painter.drawText(QPointF(x + 12, y + 4), node_label(viewer.model.names[index]))
+
+    def highlighted_edges(self):
+        mask = np.zeros(len(self.viewer.model.edges), dtype=bool)
+        if self.hovered is not None:
+            mask[self.viewer.model.incident(self.hovered)] = True
+        return mask
+
+    def node_at(self, point):
+        """Index of the node under a scene point, or None."""
+        positions = self.viewer.positions
+        if not len(positions):
+            return None
+        distance = np.hypot(positions[:, 0] - point.x(), positions[:, 1] - point.y())
+        if self.viewer.filter_mask is not None and self.viewer.filter_mode == "hide":
+            distance[~self.viewer.filter_mask] = np.inf  # Hidden by the search
+        index = int(distance.argmin())
+        radius = max(NODE_RADIUS, 3 / self.viewer.zoom())
+        return index if distance[index] <= radius else None
+
+    def hoverMoveEvent(self, event):
+        index = self.node_at(event.scenePos())
+        if index != self.hovered:
+            self.hovered = index
+            self.setToolTip(self.viewer.model.names[index] if index is not None else "")
+            self.update()
+
+    def hoverLeaveEvent(self, event):
+        self.hovered = None
+        self.setToolTip("")
+        self.update()
+
+    def mousePressEvent(self, event):
+        index = self.node_at(event.scenePos())
+        if index is None:
+            event.ignore()  # Let the view pan
+            return
+        self.held = self.viewer.nodes[self.viewer.model.names[index]]
+        self.held.dragging = True
+        self.viewer.pin_node(self.held, True)
+
+    def mouseMoveEvent(self, event):
+        if self.held is not None and self.held.index is not None:
+            point = event.scenePos()
+            self.viewer.move_node(self.held, point.x(), point.y())
+
+    def mouseReleaseEvent(self, event):
+        if self.held is not None:
+            self.viewer.release_node(self.held, event)
+            self.held = None
+
+
+PhysicsSnapshot = namedtuple(
+    "PhysicsSnapshot", "simulation version positions velocities active commands_done"
+)
+
+
+class PhysicsWorker:
+    """Runs a ForceSimulation off the GUI thread.
+
+    The worker owns the simulation. Other threads only ``submit`` callables,
+    which run between ticks, and read ``snapshot``: after every tick a fresh
+    PhysicsSnapshot with copies of the position and velocity arrays is
+    swapped in with a single reference assignment, so readers never see a
+    half-written frame and never wait on a lock.
+
+    With ``threaded=False`` nothing runs in the background; commands run
+    immediately and the owner calls ``tick()`` itself.
+    """
+
+    def __init__(self, threaded=True):
+        self.simulation = None
+        self.snapshot = None
+        self.version = 0
+        self.commands = queue.SimpleQueue()
+        self.submitted = 0
+        self.completed = 0
+        self.awake = threading.Event()
+        self.running = True
+        self.thread = None
+        if threaded:
+            self.thread = threading.Thread(target=self.run, name="physics", daemon=True)
+            self.thread.start()
+
+    def submit(self, command):
+        """Run ``command()`` on the worker before its next tick."""
+        self.submitted += 1
+        if self.thread is None:
+            command()
+            self.completed += 1
+            return
+        self.commands.put(command)
+        self.awake.set()
+
+    def run_simulation(self, simulation):
+        """Hand over a new simulation; the caller must not touch it afterwards."""
+        self.submit(lambda: setattr(self, "simulation", simulation))
+
+    def tick(self):
+        """Apply pending commands, step once and publish a snapshot."""
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                break
+            command()
+            self.completed += 1
+
+        simulation = self.simulation
+        if simulation is None:
+            return False
+        with PERF.measure("physics_tick"):
+            active = simulation.step()
+        self.version += 1
+        self.snapshot = PhysicsSnapshot(
+            simulation, self.version, simulation.positions.copy(),
+            simulation.velocities.copy(), active, self.completed,
+        )
+        return active
+
+    def run(self):
+        interval = PHYSICS_INTERVAL_MS / 1000
+        while True:
+            self.awake.wait()
+            if not self.running:
+                return
+            started = time.monotonic()
+            if not self.tick():
+                self.awake.clear()
+                if not self.commands.empty():
+                    self.awake.set()
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def stop(self):
+        self.running = False
+        self.awake.set()
+        if self.thread is not None:
+            self.thread.join()
+
+
 class GraphViewer(QGraphicsView):
-    def __init__(self):
+    def __init__(self, threaded_physics=True, render_mode="items"):
         super().__init__()
-        self.scene = QGraphicsScene()
+        self.scene = QGraphicsScene(self)
+        # Every item moves each frame, so a BSP index would be rebuilt constantly
+        self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
         self.setScene(self.scene)
-        self.graph = nx.Graph()
+        self.graph = None  # VaultGraph drawn: the whole vault, or the local graph around local_focus
+        self.source_graph = None  # The whole vault, as last passed to set_graph
         self.nodes = {}
         self.edges = {}
+        self.node_list = []
+        self.edge_list = []  # Line items, indexed like model.edges
+        self.model = None
+        self.simulation = None  # Owned by the worker once handed over
+        self.positions = np.zeros((0, 2))  # Latest snapshot, as shown on screen
+        self.velocities = np.zeros((0, 2))
+        self.snapshot_version = None
+        self.worker = PhysicsWorker(threaded=threaded_physics)
+        self.saved_positions = {}  # node name -> (x, y) that draw_graph starts from
+        self.restored_nodes = set()  # Nodes whose saved position was loaded with the vault, not placed since
+
+        # Level of detail: what is currently shown, indexed like model nodes/edges
+        self.degrees = np.zeros(0, dtype=np.intp)
+        self.node_shown = np.zeros(0, dtype=bool)
+        self.label_shown = np.zeros(0, dtype=bool)
+        self.edge_shown = np.zeros(0, dtype=bool)
+        self.dragged_nodes = set()
+        self.parked_nodes = {}  # name -> hidden InteractiveNode kept for reuse (see remove_node_item)
+        self.parked_edges = {}  # (name1, name2) -> hidden line kept for reuse
+
+        # Search filter over the shown graph: nothing is copied or laid out again,
+        # items that do not match are hidden or dimmed in place
+        self.filter_names = None  # Matching node names, None shows everything
+        self.filter_mode = "hide"  # or "dim"
+        self.filter_mask = None  # Indexed like model nodes, None without a filter
+        self.edge_filter_mask = None  # Edges with both ends matching
+        self.node_dimmed = np.zeros(0, dtype=bool)  # "items" renderer: faded right now
+        self.edge_dimmed = np.zeros(0, dtype=bool)
+
+        # Local graph mode: only the neighbourhood of the selected note is laid out and simulated
+        self.selected = None  # Name of the last clicked node
+        self.local_mode = False
+        self.local_focus = None  # Note the local graph is drawn around, None draws everything
+        self.local_depth = LOCAL_GRAPH_DEPTH
+        self.local_tags = True
+        self.local_cache = {}  # (note, depth, tags) -> frozenset of node names, oldest first
+
+        # "items": one QGraphicsItem per node/label/edge,
+        # "batched": a single GraphPainterItem draws everything
+        self.render_mode = render_mode
+        self.painter_item = None
+        self.perf_overlay = False  # Timing overlay in the top-left corner, toggled with F3
 
         # Default force layout parameters
         self.center_force = 0.01
@@ -121,10 +1999,12 @@ class GraphViewer(QGraphicsView):
         self.md_link_distance = 300
         self.structure_link_distance = 700  # Structure nodes stay apart
         self.link_distance = 750.0
+        self.repulsion_mode = "cutoff"  # or "barnes_hut" for long-range repulsion
+        self.theta = 0.9  # Barnes–Hut accuracy, lower is more exact
         
+        # Started by wake(), pulls snapshots from the worker until it is at rest
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_physics)
-        self.timer.start(30)
 
         # Enable zoom & pan
         self.scale_factor = 1.0
@@ -142,14 +2022,67 @@ class GraphViewer(QGraphicsView):
             self.scale(zoom_in_factor, zoom_in_factor)
         else:
             self.scale(zoom_out_factor, zoom_out_factor)
+        self.setRenderHint(QPainter.RenderHint.Antialiasing, self.zoom() >= EDGE_DETAIL_ZOOM)
+        self.sync_scene()
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self.sync_scene()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.sync_scene()
+
+    def zoom(self):
+        return self.transform().m11()
+
+    def set_perf_overlay(self, shown):
+        self.perf_overlay = shown
+        # The overlay sits at a fixed spot on screen, so partial repaints would smear it
+        self.setViewportUpdateMode(
+            QGraphicsView.ViewportUpdateMode.FullViewportUpdate if shown
+            else QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate
+        )
+        self.viewport().update()
+
+    def drawForeground(self, painter, rect):
+        PERF.frame()
+        if self.perf_overlay:
+            self.draw_perf_overlay(painter)
+
+    def draw_perf_overlay(self, painter):
+        """FPS and per-stage timings (last / p50 / p95 in ms) in viewport coordinates."""
+        lines = [
+            f"{PERF.fps():3d} fps  {len(self.node_list)} nodes  {len(self.edge_list)} edges",
+            f"{'ms':<15}{'last':>9}{'p50':>9}{'p95':>9}",
+        ]
+        for summary in PERF.summaries():
+            lines.append(
+                f"{summary['stage']:<15}{summary['last_ms']:9.1f}{summary['p50_ms']:9.1f}{summary['p95_ms']:9.1f}"
+            )
+
+        font = QFont("monospace", 9)
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        metrics = QFontMetrics(font)
+        width = max(metrics.horizontalAdvance(line) for line in lines) + 16
+        height = metrics.lineSpacing() * len(lines) + 12
+
+        painter.save()
+        painter.resetTransform()
+        painter.setFont(font)
+        painter.fillRect(QRectF(8, 8, width, height), QColor(0, 0, 0, 170))
+        painter.setPen(QColor(LABEL_COLOR))
+        for i, line in enumerate(lines):
+            painter.drawText(QPointF(16, 14 + metrics.ascent() + i * metrics.lineSpacing()), line)
+        painter.restore()
 
     def is_tag_node(self, node_name):
         """Identify tag nodes."""
-        return node_name.startswith("#")
+        return node_kind(node_name) == NODE_TAG
     
     def is_md_node(self, node_name):
         """Identify tag nodes."""
-        return node_name.endswith(".md")
+        return node_kind(node_name) == NODE_NOTE
 
     def get_link_distance(self, node1, node2):
         """Return preferred link distance based on node type."""
@@ -159,88 +2092,664 @@ class GraphViewer(QGraphicsView):
             return self.md_link_distance
         return self.structure_link_distance
 
-    def draw_graph(self):
+    def link_distances(self, model, graph):
+        """get_link_distance for every edge of ``model``, looked up in ``graph``'s kinds column."""
+        index, kinds = graph.index, graph.kinds
+        node_kinds = np.array(
+            [kinds[index[name]] if name in index else node_kind(name) for name in model.names], dtype=np.uint8
+        )
+        ends = node_kinds[model.edges]
+        lengths = np.full(len(ends), float(self.structure_link_distance))
+        lengths[(ends == NODE_NOTE).any(axis=1)] = self.md_link_distance
+        lengths[(ends == NODE_TAG).any(axis=1)] = self.tag_link_distance
+        return lengths
+
+    def draw_graph(self, keep_layout=True):
+        """Show self.graph, starting from the saved positions.
+
+        With ``keep_layout`` an existing scene is reconciled with the graph
+        instead of rebuilt, so redrawing (after a search or a rebuild) keeps
+        every known node's item, position and velocity. Without it the
+        scene is cleared and laid out from the saved positions only.
+        """
+        if keep_layout and self.model is not None:
+            self.reconcile_scene()
+            return
         self.scene.clear()
         self.nodes.clear()
         self.edges.clear()
-
-        pos = nx.spring_layout(self.graph, k=self.link_distance / 1000, scale=500)
-
-        for node, (x, y) in pos.items():
-            node_item = InteractiveNode(node, self, x * DISTANCE_MULTIPLIER, y * DISTANCE_MULTIPLIER)
+        self.parked_nodes.clear()
+        self.parked_edges.clear()
+        self.dragged_nodes.clear()
+        self.node_list, self.edge_list, self.model = [], [], None  # Items are gone
+        self.painter_item = None
+        if self.render_mode == "batched":
+            self.painter_item = GraphPainterItem(self)
+            self.scene.addItem(self.painter_item)
+
+        with PERF.measure("layout", nodes=self.graph.number_of_nodes()):
+            positions, alpha = self.initial_layout()
+
+        with PERF.measure("scene_build", nodes=self.graph.number_of_nodes()):
+            for node, (x, y) in positions.items():
+                self.add_node_item(node, x, y)
+            for node1, node2 in self.graph.edges:
+                self.add_edge_item(node1, node2)
+
+            self.rebuild_model(positions, alpha=alpha)
+
+    def reconcile_scene(self):
+        """Create and destroy only the items that differ between the scene and self.graph.
+
+        Nodes that are new to the scene are placed by initial_layout, i.e.
+        next to their neighbours when most of the graph is already shown.
+        Items that leave the scene are parked (see remove_node_item), so
+        switching to a local graph and back does not pay for destroying
+        and recreating most of the vault's items.
+        """
+        with PERF.measure("scene_reconcile", nodes=self.graph.number_of_nodes()):
+            self.update_physics()  # Start from the newest snapshot
+            positions = self.position_map()
+            velocities = self.velocity_map()
+            self.saved_positions.update(positions)
+
+            removed_edges = [edge for edge in self.edges if not self.graph.has_edge(*edge)]
+            removed_nodes = [name for name in self.nodes if name not in self.graph]
+            for name1, name2 in removed_edges:
+                self.remove_edge_item(name1, name2, park=True)
+            for name in removed_nodes:
+                self.remove_node_item(name, park=True)
+                positions.pop(name)
+
+            added_nodes = [name for name in self.graph if name not in self.nodes]
+            if added_nodes:
+                layout, _ = self.initial_layout()
+                for name in added_nodes:
+                    positions[name] = layout[name]
+                    self.add_node_item(name, *positions[name])
+            added_edges = [
+                (name1, name2) for name1, name2 in self.graph.edges
+                if (name1, name2) not in self.edges and (name2, name1) not in self.edges
+            ]
+            for name1, name2 in added_edges:
+                self.add_edge_item(name1, name2)
+
+            if removed_edges or removed_nodes or added_nodes or added_edges:
+                self.rebuild_model(positions, velocities, max(self.simulation.alpha, REHEAT_ALPHA))
+
+    def initial_layout(self):
+        """Scene positions for every node of self.graph, and the alpha to start at.
+
+        Nodes with a saved position keep it; the rest are placed by
+        layout_graph.
+        """
+        known = {node: self.saved_positions[node] for node in self.graph if node in self.saved_positions}
+        return self.layout_graph(self.graph, known, self.restored_nodes)
+
+    def layout_graph(self, graph, known, restored=()):
+        """Positions for every node of ``graph`` around the ``known`` ones, and the alpha to start at.
+
+        When most of the graph was restored with the vault (``restored``,
+        see ``restored_nodes``) the rest are placed next to their neighbours
+        and the simulation starts warm instead of hot, so it settles in a
+        few ticks without reshuffling the map. Otherwise the graph is laid
+        out with the known nodes fixed, by spring_layout or, for large
+        graphs, multilevel_layout. Positions placed earlier in the same
+        load do not count towards a warm start: chunks double in size, so
+        each would otherwise be half known and the vault would never be
+        laid out.
+
+        Only reads the viewer's settings, so the vault loader calls it from
+        its own thread with the graph of a chunk.
+        """
+        n = graph.number_of_nodes()
+        if len(known) == n:
+            return dict(known), REHEAT_ALPHA
+        restored = sum(1 for node in known if node in restored)
+        if restored and restored >= WARM_START_MIN_KNOWN * n:
+            positions = dict(known)
+            pending = [node for node in graph if node not in positions]
+            while pending:
+                # Grow outwards from the placed nodes; unreachable leftovers are scattered over the map
+                ready = [node for node in pending if any(n in positions for n in graph.neighbors(node))]
+                for node in ready or pending:
+                    positions[node] = self.spawn_position(node, positions, graph)
+                pending = [node for node in pending if node not in positions]
+            return positions, REHEAT_ALPHA
+
+        fixed = {}
+        if known:
+            # Only the new nodes need a layout, held in place by the known nodes they touch
+            new = {node for node in graph if node not in known}
+            fixed = {n: known[n] for node in new for n in graph.neighbors(node) if n in known}
+            graph = graph.subgraph(new | fixed.keys())
+        positions = dict(known)
+        if graph.number_of_nodes() >= MULTILEVEL_MIN_NODES:
+            model = GraphModel.from_graph(graph)
+            rest_lengths = self.link_distances(model, graph)
+            fixed_ids = {model.index[node]: xy for node, xy in fixed.items()}
+            pos = multilevel_layout(model.edges, rest_lengths, len(model), fixed=fixed_ids, **self.force_parameters())
+            positions.update(zip(model.names, pos.tolist()))
+            return positions, REHEAT_ALPHA
+
+        k = self.link_distance / 1000
+        if not fixed:
+            pos = nx.spring_layout(graph.to_networkx(), k=k, scale=LAYOUT_SCALE)
+            positions.update(
+                (node, (x * DISTANCE_MULTIPLIER, y * DISTANCE_MULTIPLIER)) for node, (x, y) in pos.items()
+            )
+            return positions, 1.0
+
+        # Fixed nodes switch off spring_layout's rescaling, so work in its unit frame
+        frame = LAYOUT_SCALE * DISTANCE_MULTIPLIER
+        pos = nx.spring_layout(
+            graph.to_networkx(), k=k, fixed=list(fixed),
+            pos={node: (x / frame, y / frame) for node, (x, y) in fixed.items()},
+        )
+        positions.update((node, (x * frame, y * frame)) for node, (x, y) in pos.items())
+        return positions, 1.0
+
+    def set_render_mode(self, render_mode):
+        """Switch between "items" and "batched" rendering, keeping the layout."""
+        if render_mode == self.render_mode:
+            return
+        self.render_mode = render_mode
+        if self.model is None:
+            return
+        positions = self.position_map()
+        velocities = self.velocity_map()
+        self.scene.clear()
+        self.nodes.clear()
+        self.edges.clear()
+        self.parked_nodes.clear()
+        self.parked_edges.clear()
+        self.dragged_nodes.clear()
+        self.node_list, self.edge_list, self.model = [], [], None
+        self.painter_item = None
+        if render_mode == "batched":
+            self.painter_item = GraphPainterItem(self)
+            self.scene.addItem(self.painter_item)
+        for node in positions:
+            self.add_node_item(node, *positions[node])
+        for node1, node2 in self.graph.edges:
+            if node1 in self.nodes and node2 in self.nodes:
+                self.add_edge_item(node1, node2)
+        self.rebuild_model(positions, velocities)
+
+    def add_node_item(self, name, x, y):
+        if self.painter_item is not None:
+            node_item = PaintedNode(name)
+        elif name in self.parked_nodes:
+            node_item = self.parked_nodes.pop(name)
+            node_item.move_to(x, y)
+        else:
+            node_item = InteractiveNode(name, self, x, y)
             self.scene.addItem(node_item)
-            self.nodes[node] = node_item
-
-        for edge in self.graph.edges:
-            node1, node2 = self.nodes[edge[0]], self.nodes[edge[1]]
-            line = QGraphicsLineItem()
-            line.setPen(QPen(Qt.GlobalColor.gray, 1))
-            self.scene.addItem(line)
-            self.edges[(edge[0], edge[1])] = line
-            node1.edges.append(line)
-            node2.edges.append(line)
+        self.nodes[name] = node_item
+        return node_item
+
+    def remove_node_item(self, name, park=False):
+        """Take a node's item out of the scene.
+
+        With ``park`` the item is only hidden and kept for add_node_item to
+        reuse: removing items one by one costs time proportional to the
+        scene's size in Qt, which adds up when most of a vault leaves at once.
+        """
+        node_item = self.nodes.pop(name, None)
+        if node_item is not None:
+            self.dragged_nodes.discard(node_item)
+            if isinstance(node_item, InteractiveNode):
+                if park:
+                    node_item.hide()
+                    node_item.label.hide()
+                    self.parked_nodes[name] = node_item
+                else:
+                    self.scene.removeItem(node_item.label)
+                    self.scene.removeItem(node_item)
+
+    def add_edge_item(self, name1, name2):
+        """Create the line for an edge (None with the batched renderer)."""
+        line = None
+        if self.painter_item is None:
+            line = self.parked_edges.pop((name1, name2), None) or self.parked_edges.pop((name2, name1), None)
+            if line is None:
+                line = QGraphicsLineItem()
+                line.setPen(QPen(Qt.GlobalColor.gray, 1))
+                self.scene.addItem(line)
+        self.edges[(name1, name2)] = line
+        return line
+
+    def remove_edge_item(self, name1, name2, park=False):
+        key = (name1, name2) if (name1, name2) in self.edges else (name2, name1)
+        line = self.edges.pop(key, None)
+        if line is not None:
+            if park:
+                line.hide()
+                self.parked_edges[key] = line
+            else:
+                self.scene.removeItem(line)
+
+    def position_map(self):
+        return dict(zip((node.name for node in self.node_list), self.positions.tolist()))
+
+    def velocity_map(self):
+        return dict(zip((node.name for node in self.node_list), self.velocities.tolist()))
+
+    def rebuild_model(self, positions, velocities=None, alpha=1.0):
+        """Re-index the scene items into a fresh GraphModel and simulation.
+
+        ``positions`` and ``velocities`` map node names to the state each
+        node should start from (velocities are random when missing).
+        """
+        self.node_list = list(self.nodes.values())
+        self.edge_list = list(self.edges.values())
+        self.model = GraphModel((node.name for node in self.node_list), self.edges.keys())
+        for index, node_item in enumerate(self.node_list):
+            node_item.index = index
+        self.degrees = np.diff(self.model.incident_offsets)
+        if self.painter_item is None:
+            self.node_shown = np.array([node.isVisible() for node in self.node_list], dtype=bool)
+            self.label_shown = np.array([node.label.isVisible() for node in self.node_list], dtype=bool)
+            self.edge_shown = np.array([line.isVisible() for line in self.edge_list], dtype=bool)
+            self.node_dimmed = np.array([node.opacity() < 1 for node in self.node_list], dtype=bool)
+            self.edge_dimmed = np.array([line.opacity() < 1 for line in self.edge_list], dtype=bool)
+
+        simulation = ForceSimulation(
+            [positions[node.name] for node in self.node_list], self.model.edges,
+            self.link_distances(self.model, self.graph),
+        )
+        for node_item in self.node_list:
+            if velocities and node_item.name in velocities:
+                simulation.velocities[node_item.index] = velocities[node_item.name]
+            simulation.pinned[node_item.index] = node_item.dragging
+        simulation.alpha = alpha
+        simulation.configure(**self.force_parameters())
+        simulation.max_speed = float(np.median(simulation.rest_lengths)) if len(simulation.rest_lengths) else None
+
+        self.simulation = simulation
+        self.positions = simulation.positions.copy()
+        self.velocities = simulation.velocities.copy()
+        self.snapshot_version = None
+        self.worker.run_simulation(simulation)
+        self.update_filter_mask()
+        self.sync_scene()
+        self.wake(alpha)
+
+    def apply_delta(self, added_nodes, removed_nodes, added_edges, removed_edges):
+        """Patch only the scene items touched by a graph change.
+
+        Every other node keeps its position and velocity; new nodes start
+        at their saved position (where the vault loader laid them out) or
+        next to the neighbours they already have in the scene.
+        """
+        if self.simulation is None:
+            self.draw_graph()
+            return
 
-    def update_physics(self):
-        k = 50
-        strength = 0.005
-        repel_strength = 1000
+        with PERF.measure("scene_patch", nodes=len(added_nodes) + len(removed_nodes)):
+            self.update_physics()
+            alpha = max(self.simulation.alpha, REHEAT_ALPHA)
+            positions = self.position_map()
+            velocities = self.velocity_map()
 
-        for node in self.nodes.values():
-            if node.dragging:
-                continue
-            
-            if node.name not in self.graph:
-                continue
+            for name1, name2 in removed_edges:
+                self.remove_edge_item(name1, name2)
+            for name in removed_nodes:
+                self.remove_node_item(name)
+                positions.pop(name, None)
 
-            fx, fy = 0, 0
-
-            for neighbor in self.graph.neighbors(node.name):
-                if neighbor in self.nodes:
-                    other = self.nodes[neighbor]
-                    dx, dy = other.x() - node.x(), other.y() - node.y()
-                    distance = math.sqrt(dx**2 + dy**2) or 0.1
-                    preferred_distance = self.get_link_distance(node.name, neighbor)  # 🔥 Dynamic distance
-                    
-                    force = (distance - preferred_distance) * strength
-                    fx += dx / distance * force
-                    fy += dy / distance * force
-
-            for other in self.nodes.values():
-                if other is node:
+            for name in added_nodes:
+                if name in self.nodes or name not in self.graph:
                     continue
-                dx, dy = other.x() - node.x(), other.y() - node.y()
-                distance = math.sqrt(dx**2 + dy**2) or 0.1
-                if distance < k:
-                    force = repel_strength / (distance**2)
-                    fx -= dx / distance * force
-                    fy -= dy / distance * force
-
-            node.velocity[0] = (node.velocity[0] + fx) * 0.9
-            node.velocity[1] = (node.velocity[1] + fy) * 0.9
-            node.setX(node.x() + node.velocity[0])
-            node.setY(node.y() + node.velocity[1])
-
-            # Update edges
-            for edge in node.edges:
-                other_node = self.get_other_edge_node(edge, node)
-                if other_node:
-                    edge.setLine(node.x(), node.y(), other_node.x(), other_node.y())
-
-    def get_other_edge_node(self, edge, node):
-        for edge_nodes, line in self.edges.items():
-            if edge_nodes[0] == node.name:
-                return self.nodes[edge_nodes[1]]
-            elif edge_nodes[1] == node.name:
-                return self.nodes[edge_nodes[0]]
-        return None
+                positions[name] = self.spawn_position(name, positions)
+                self.add_node_item(name, *positions[name])
+            for name1, name2 in added_edges:
+                if name1 in self.nodes and name2 in self.nodes and not (
+                    (name1, name2) in self.edges or (name2, name1) in self.edges
+                ):
+                    self.add_edge_item(name1, name2)
+
+            self.rebuild_model(positions, velocities, alpha)
+
+    def spawn_position(self, name, positions, graph=None):
+        """Start position for a new node: its saved spot, near its placed neighbours, else anywhere on the map.
+
+        Nodes without placed neighbours (untagged, unlinked notes) are
+        scattered uniformly over a disc sized so that every node of the
+        graph would get about ``md_link_distance`` of room; piling them up
+        at the origin would make the cutoff repulsion quadratic in their count.
+        """
+        if name in self.saved_positions:
+            return self.saved_positions[name]
+        graph = graph if graph is not None else self.graph
+        placed = [positions[n] for n in graph.neighbors(name) if n in positions]
+        if not placed:
+            radius = np.sqrt(graph.number_of_nodes()) * self.md_link_distance * np.sqrt(np.random.uniform())
+            angle = np.random.uniform(0, 2 * np.pi)
+            return radius * np.cos(angle), radius * np.sin(angle)
+        x = sum(p[0] for p in placed) / len(placed)
+        y = sum(p[1] for p in placed) / len(placed)
+        return x + np.random.uniform(-20, 20), y + np.random.uniform(-20, 20)
+
+    def force_parameters(self):
+        """The viewer's force settings, as ForceSimulation attributes."""
+        return {
+            "center_force": self.center_force,
+            "repel_force": self.repel_force,
+            "repulsion_mode": self.repulsion_mode,
+            "theta": self.theta,
+        }
+
+    def update_forces(self, center=None, repel=None, repulsion_mode=None, theta=None):
+        """Update force layout settings without rebuilding the scene."""
+        if center is not None:
+            self.center_force = center
+        if repel is not None:
+            self.repel_force = repel
+        if repulsion_mode is not None:
+            self.repulsion_mode = repulsion_mode
+        if theta is not None:
+            self.theta = theta
+        if self.simulation is not None:
+            simulation, parameters = self.simulation, self.force_parameters()
+            self.worker.submit(lambda: simulation.configure(**parameters))
+        self.wake()
+
+    def wake(self, alpha=REHEAT_ALPHA):
+        """Reheat the simulation and restart the physics timer if it was asleep."""
+        if self.simulation is None:
+            return
+        simulation = self.simulation
+        self.worker.submit(lambda: simulation.reheat(alpha))
+        if not self.timer.isActive():
+            self.timer.start(PHYSICS_INTERVAL_MS)
+
+    def pin_node(self, node, pinned):
+        """Exclude a node from integration while the user holds it.
+
+        The simulation stays warm for the whole drag so the neighbours
+        follow, and cools down again after release.
+        """
+        if pinned:
+            self.dragged_nodes.add(node)
+        else:
+            self.dragged_nodes.discard(node)
+        if self.simulation is None or node.index is None:
+            return
+        simulation, index = self.simulation, node.index
+        self.worker.submit(lambda: simulation.pin(index, pinned))
+        self.wake()
+
+    def release_node(self, node, event):
+        """End a press on ``node``; a press that barely moved is a click and selects it."""
+        node.dragging = False
+        self.pin_node(node, False)
+        moved = event.scenePos() - event.buttonDownScenePos(Qt.MouseButton.LeftButton)
+        if moved.manhattanLength() * self.zoom() < CLICK_DISTANCE_PX:
+            name = node.name
+            QTimer.singleShot(0, lambda: self.select_node(name))  # Redraws the scene, so not from its own event
+
+    def move_node(self, node, x, y):
+        """Send a user-driven position to the worker and redraw the node's edges now."""
+        if self.simulation is None or node.index is None:
+            return
+        simulation, index = self.simulation, node.index
+        self.worker.submit(lambda: simulation.move(index, x, y))
+        self.positions[index] = (x, y)
+        self.sync_edges(self.model.incident(index))
+
+    def update_physics(self):
+        """Timer slot: show the newest snapshot published by the physics worker."""
+        if self.simulation is None:
+            self.timer.stop()
+            return
+        if self.worker.thread is None:
+            self.worker.tick()
+
+        snapshot = self.worker.snapshot
+        if snapshot is None or snapshot.simulation is not self.simulation:
+            return  # Worker has not picked up the current simulation yet
+        if snapshot.version != self.snapshot_version:
+            self.snapshot_version = snapshot.version
+            self.positions = snapshot.positions
+            self.velocities = snapshot.velocities
+            self.sync_scene()
+        if not snapshot.active and snapshot.commands_done >= self.worker.submitted:
+            self.timer.stop()  # Asleep until wake()
+
+    def stop_physics(self):
+        self.timer.stop()
+        self.worker.stop()
+
+    def sync_scene(self):
+        """Copy the snapshot positions onto the on-screen items, once per frame.
+
+        Items outside the viewport are hidden and not moved at all; labels
+        and edges follow the level-of-detail rules in visible_items().
+        """
+        if self.model is None or len(self.positions) != len(self.node_list):
+            return
+        if sip.isdeleted(self.scene):
+            return  # Scrolled or resized while Qt tears the window down
+        if self.painter_item is not None:
+            self.painter_item.refresh()
+            return
+        with PERF.measure("scene_sync"):
+            self.sync_items()
+
+    def sync_items(self):
+        """Move, show and hide the per-node items of the "items" renderer."""
+        nodes, labels, edges = self.visible_items()
+
+        for index in np.flatnonzero(nodes != self.node_shown).tolist():
+            self.node_list[index].setVisible(bool(nodes[index]))
+        for index in np.flatnonzero(labels != self.label_shown).tolist():
+            self.node_list[index].label.setVisible(bool(labels[index]))
+        for index in np.flatnonzero(edges != self.edge_shown).tolist():
+            self.edge_list[index].setVisible(bool(edges[index]))
+        self.node_shown, self.label_shown, self.edge_shown = nodes, labels, edges
+
+        shown = np.flatnonzero(nodes)
+        for index, (x, y) in zip(shown.tolist(), self.positions[shown].tolist()):
+            node = self.node_list[index]
+            if not node.dragging:
+                node.move_to(x, y)
+        self.sync_edges(np.flatnonzero(edges))
+
+    def set_graph(self, graph, keep_layout=True):
+        """Draw ``graph``, or only the local graph around ``local_focus``.
+
+        The local graph is a subgraph of ``graph``, so only its nodes are
+        laid out and simulated.
+        """
+        self.source_graph = graph
+        if self.local_focus is not None and not graph.has_node(self.local_focus):
+            self.local_focus = None  # The note is gone: back to the whole vault
+        if self.local_focus is None:
+            self.graph = graph
+        else:
+            self.graph = graph.subgraph(self.local_nodes(self.local_focus))
+        self.draw_graph(keep_layout)
+
+    def local_nodes(self, name):
+        """The nodes within ``local_depth`` hops of ``name``, cached per (note, depth, tags)."""
+        key = (name, self.local_depth, self.local_tags)
+        nodes = self.local_cache.pop(key, None)  # Re-inserted below as the newest entry
+        if nodes is None:
+            nodes = self.source_graph.ego_nodes(name, self.local_depth, self.local_tags)
+            if len(self.local_cache) >= LOCAL_CACHE_SIZE:
+                del self.local_cache[next(iter(self.local_cache))]
+        self.local_cache[key] = nodes
+        return nodes
+
+    def invalidate_local(self, names):
+        """Forget the cached neighbourhoods that contain any of ``names``.
+
+        An edge change can only alter a neighbourhood it touches, so passing
+        the changed nodes and both ends of every changed edge is enough.
+        """
+        names = set(names)
+        for key in [key for key, nodes in self.local_cache.items() if not names.isdisjoint(nodes)]:
+            del self.local_cache[key]
+
+    def reset_local(self):
+        """Forget the selection, the focus and every cached neighbourhood."""
+        self.local_cache.clear()
+        self.selected = self.local_focus = None
+
+    def select_node(self, name):
+        """A node was clicked; in local mode the local graph moves to it."""
+        self.selected = name
+        if self.local_mode and name != self.local_focus:
+            self.set_local_focus(name)
+
+    def set_local_focus(self, name):
+        self.local_focus = name
+        if self.source_graph is not None:
+            self.set_graph(self.source_graph)
+
+    def set_local_mode(self, enabled):
+        """Show only the neighbourhood of the selected note, or the whole vault."""
+        self.local_mode = enabled
+        self.set_local_focus(self.selected if enabled else None)
+
+    def set_local_depth(self, depth):
+        self.local_depth = depth
+        if self.local_focus is not None:
+            self.set_graph(self.source_graph)
+
+    def set_local_tags(self, include_tags):
+        self.local_tags = include_tags
+        if self.local_focus is not None:
+            self.set_graph(self.source_graph)
+
+    def set_filter(self, names):
+        """Show only the nodes in ``names`` (None shows everything).
+
+        The rest are hidden or dimmed in place, per ``filter_mode``; every
+        item keeps its position and velocity and the simulation keeps
+        running on the whole graph, so filtering is only a repaint.
+        """
+        self.filter_names = None if names is None else set(names)
+        self.update_filter_mask()
+        self.sync_scene()
+
+    def set_filter_mode(self, filter_mode):
+        """"hide" or "dim" the nodes a filter leaves out."""
+        self.filter_mode = filter_mode
+        self.update_filter_mask()
+        self.sync_scene()
+
+    def update_filter_mask(self):
+        """Re-index ``filter_names`` against the current model."""
+        if self.model is None or self.filter_names is None:
+            self.filter_mask = self.edge_filter_mask = None
+        else:
+            index = self.model.index
+            self.filter_mask = np.zeros(len(self.model), dtype=bool)
+            self.filter_mask[[index[name] for name in self.filter_names if name in index]] = True
+            self.edge_filter_mask = self.filter_mask[self.model.edges].all(axis=1)
+        if self.painter_item is None:
+            self.apply_dimming()
+
+    def faded_items(self):
+        """Masks of the nodes and edges a "dim" filter fades out."""
+        if self.filter_mask is None or self.filter_mode != "dim":
+            return np.zeros(len(self.node_list), dtype=bool), np.zeros(len(self.edge_list), dtype=bool)
+        return ~self.filter_mask, ~self.edge_filter_mask
+
+    def apply_dimming(self):
+        """Set the opacity of the items whose faded state changed."""
+        nodes, edges = self.faded_items()
+        for index in np.flatnonzero(nodes != self.node_dimmed).tolist():
+            opacity = FILTER_DIM_OPACITY if nodes[index] else 1.0
+            self.node_list[index].setOpacity(opacity)
+            self.node_list[index].label.setOpacity(opacity)
+        for index in np.flatnonzero(edges != self.edge_dimmed).tolist():
+            self.edge_list[index].setOpacity(FILTER_DIM_OPACITY if edges[index] else 1.0)
+        self.node_dimmed, self.edge_dimmed = nodes, edges
+
+    def visible_items(self):
+        """Boolean masks of the nodes, labels and edges worth drawing right now."""
+        zoom = self.zoom()
+        margin = CULL_MARGIN_PX / zoom
+        view = self.mapToScene(self.viewport().rect()).boundingRect()
+        left, top = view.left() - margin, view.top() - margin
+        right, bottom = view.right() + margin, view.bottom() + margin
+
+        x, y = self.positions[:, 0], self.positions[:, 1]
+        nodes = (x >= left) & (x <= right) & (y >= top) & (y <= bottom)
+        hidden = self.filter_mask is not None and self.filter_mode == "hide"
+        if hidden:
+            nodes &= self.filter_mask
+        for node in self.dragged_nodes:
+            nodes[node.index] = True
+
+        labels = nodes.copy()
+        if zoom < LABEL_ZOOM:
+            labels &= self.degrees >= LABEL_DEGREE * LABEL_ZOOM / (2 * zoom)
+
+        ends = self.positions[self.model.edges]
+        low, high = ends.min(axis=1), ends.max(axis=1)
+        edges = (high[:, 0] >= left) & (low[:, 0] <= right) & (high[:, 1] >= top) & (low[:, 1] <= bottom)
+        if zoom < EDGE_DETAIL_ZOOM:
+            # Far out, edges shorter than a pixel are just noise
+            extent = (high - low).max(axis=1) if len(ends) else np.zeros(0)
+            edges &= extent * zoom >= 1
+        if hidden:
+            edges &= self.edge_filter_mask
+        return nodes, labels, edges
+
+    def sync_edges(self, edge_ids=None):
+        """Redraw edge lines from the endpoint arrays (all edges by default)."""
+        if self.painter_item is not None:
+            self.painter_item.refresh()
+            return
+        if edge_ids is None:
+            edge_ids = np.arange(len(self.edge_list))
+        endpoints = self.positions[self.model.edges[edge_ids]].reshape(-1, 4)
+        for edge_id, (x1, y1, x2, y2) in zip(edge_ids.tolist(), endpoints.tolist()):
+            self.edge_list[edge_id].setLine(x1, y1, x2, y2)
 
 
 class ObsidianGraphApp(QMainWindow):
-    def __init__(self):
+    # Emitted from the watcher with a list of (note path, (tags, links, aliases) or None)
+    # and the time.monotonic() of the batch's first file event (or None)
+    files_changed = pyqtSignal(object, object)
+    # Emitted from the VaultLoader thread, always with the loader first
+    vault_batch = pyqtSignal(object, object, object)  # VaultLoader.plan() of a chunk and its positions
+    vault_progress = pyqtSignal(object, object)  # VaultLoadProgress
+    vault_loaded = pyqtSignal(object, bool)  # True if the job ran to the end
+
+    def __init__(self, threaded_physics=True):
         super().__init__()
         self.vault_path = None
-        self.graph_viewer = GraphViewer()
-        self.graph = self.graph_viewer.graph
+        self.files = {}  # note path -> {"tags": ..., "links": ..., "aliases": ...} as last parsed
+        self.tag_index = TagIndex()
+        self.link_index = LinkIndex()
+        self.metadata_cache = None
+        self.scan_workers = None  # Parser processes, None uses every core
+        self.scan_pool = None
+        self.scan_pool_workers = 0
+        self.change_quiet_window = CHANGE_QUIET_WINDOW
+        self.graph_viewer = GraphViewer(threaded_physics=threaded_physics)
+        self.graph = None  # VaultGraph of the vault, created by the first build
+        self.files_changed.connect(self.apply_file_changes)
+        self.position_timer = QTimer(self)
+        self.position_timer.timeout.connect(self.save_positions)
+
+        # Background loading: the VaultLoader sends finished chunks to the GUI thread
+        self.loader = None
+        self.loaded_chunks = 0
+        self.load_started = None
+        self.loaded_delta = ([], [], [])  # (added nodes, added edges, removed edges) not shown yet
+        self.vault_batch.connect(self.load_batch)
+        self.vault_progress.connect(self.show_load_progress)
+        self.vault_loaded.connect(self.finish_loading)
+        # Loaded batches are drawn once pending UI events have been handled
+        self.scene_refresh = QTimer(self)
+        self.scene_refresh.setSingleShot(True)
+        self.scene_refresh.timeout.connect(self.show_loaded_batch)
         self.initUI()
 
     def initUI(self):
@@ -253,17 +2762,52 @@ class ObsidianGraphApp(QMainWindow):
         self.vault_btn = QPushButton("Choose Vault")
         self.vault_btn.clicked.connect(self.select_vault)
 
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setMaximumHeight(4)
+        self.progress_bar.hide()
+
         self.search_bar = QLineEdit()
-        self.search_bar.setPlaceholderText("Search for notes or tags...")
-        self.search_bar.textChanged.connect(self.generate_graph)
+        self.search_bar.setPlaceholderText("Search for tags, e.g. #todo #work or #todo+#work...")
+        self.search_bar.textChanged.connect(self.apply_search)
+
+        self.dim_box = QCheckBox("Dim non-matching")
+        self.dim_box.toggled.connect(
+            lambda checked: self.graph_viewer.set_filter_mode("dim" if checked else "hide")
+        )
+
+        # Local graph: only the neighbourhood of the clicked note is drawn
+        self.local_box = QCheckBox("Local graph")
+        self.local_box.toggled.connect(self.graph_viewer.set_local_mode)
+        self.depth_box = QSpinBox()
+        self.depth_box.setRange(1, 5)
+        self.depth_box.setPrefix("Depth ")
+        self.depth_box.setValue(LOCAL_GRAPH_DEPTH)
+        self.depth_box.valueChanged.connect(self.graph_viewer.set_local_depth)
+        self.local_tags_box = QCheckBox("Tags")
+        self.local_tags_box.setChecked(True)
+        self.local_tags_box.toggled.connect(self.graph_viewer.set_local_tags)
 
         self.graph_btn = QPushButton("Generate Graph")
         self.graph_btn.clicked.connect(self.generate_graph)
 
+        # F3 shows the timing overlay, F4 appends the current timings to the perf log
+        QShortcut(QKeySequence("F3"), self).activated.connect(
+            lambda: self.graph_viewer.set_perf_overlay(not self.graph_viewer.perf_overlay)
+        )
+        QShortcut(QKeySequence("F4"), self).activated.connect(self.dump_perf_log)
+
         # Add components to layout
         layout.addWidget(self.label)
+        layout.addWidget(self.progress_bar)
         layout.addWidget(self.vault_btn)
-        layout.addWidget(self.search_bar)
+        search_row = QHBoxLayout()
+        search_row.addWidget(self.search_bar)
+        search_row.addWidget(self.dim_box)
+        search_row.addWidget(self.local_box)
+        search_row.addWidget(self.depth_box)
+        search_row.addWidget(self.local_tags_box)
+        layout.addLayout(search_row)
         layout.addWidget(self.graph_btn)
 
         layout.addWidget(self.graph_viewer)
@@ -277,149 +2821,469 @@ class ObsidianGraphApp(QMainWindow):
     def select_vault(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Vault Folder")
         if folder:
-            self.vault_path = folder
-            self.label.setText(f"Vault: {os.path.basename(folder)}")
-            self.build_graph()
-            self.graph_viewer.draw_graph()
-            self.start_watching_vault()  # 🔥 start watching for changes
-
-    def handle_file_change(self, file_path):
-        file_name = os.path.basename(file_path)
-        if not file_name.endswith(".md"):
+            self.open_vault(folder)
+
+    def open_vault(self, folder):
+        """Start loading a vault in the background; its notes show up chunk by chunk."""
+        self.save_positions()  # Layout of the vault we are leaving
+        self.stop_loading()
+        self.stop_watching_vault()
+        self.position_timer.stop()
+        same_vault = folder == self.vault_path
+        self.vault_path = folder
+        self.open_metadata_cache()
+        if self.metadata_cache:
+            self.graph_viewer.saved_positions = self.metadata_cache.load_positions()
+        elif not same_vault:
+            self.graph_viewer.saved_positions = {}
+        self.graph_viewer.restored_nodes = set(self.graph_viewer.saved_positions)
+
+        self.reset_graph()
+        self.graph_viewer.reset_local()
+        self.graph_viewer.set_graph(self.graph, keep_layout=False)  # Drop the previous vault's scene
+        self.load_started = time.perf_counter()
+        self.loaded_chunks = 0
+        self.loaded_delta = ([], [], [])
+        self.loader = VaultLoader(self)
+        self.show_load_progress(self.loader, self.loader.progress())
+        self.loader.start()
+
+    def load_batch(self, loader, batch, positions):
+        """Add a finished chunk from the loader to the graph and the scene."""
+        if loader is not self.loader:
+            return  # Queued before its job was cancelled
+        with PERF.measure("graph_build", files=len(batch[0])):
+            for pending, changed in zip(self.loaded_delta, self.add_notes(*batch)):
+                pending.extend(changed)
+        self.graph_viewer.saved_positions.update(positions)  # New nodes start where the loader laid them out
+        self.graph_viewer.local_cache.clear()  # A whole chunk may reach into any neighbourhood
+        self.loaded_chunks += 1
+        if self.loaded_chunks == 1:
+            PERF.record("first_chunk", time.perf_counter() - self.load_started)
+        self.scene_refresh.start(0)
+
+    def show_loaded_batch(self):
+        """Patch the scene with what the loaded chunks changed, like apply_file_changes."""
+        added_nodes, added_edges, removed_edges = self.loaded_delta
+        self.loaded_delta = ([], [], [])
+        viewer = self.graph_viewer
+        if viewer.local_focus is None:
+            if removed_edges:
+                # A link that found a better match in a later note may have been undone and redone
+                added_edges = [e for e in added_edges if self.graph.has_edge(*e)]
+                removed_edges = [e for e in removed_edges if not self.graph.has_edge(*e)]
+            viewer.apply_delta(added_nodes, [], added_edges, removed_edges)
+        else:
+            viewer.set_graph(self.graph)
+        if self.search_bar.text().strip():
+            self.apply_search()  # New notes may match
+        if self.loader is not None:
+            self.loader.drained.set()  # Ready for the next batch
+
+    def show_load_progress(self, loader, progress):
+        if loader is not self.loader:
             return
+        status = f"Vault: {os.path.basename(self.vault_path)} (loading {progress.files}"
+        if progress.total_files is not None:
+            status += f"/{progress.total_files}"
+            self.progress_bar.setRange(0, max(progress.total_bytes, 1))
+            self.progress_bar.setValue(progress.bytes)
+        else:
+            self.progress_bar.setRange(0, 0)  # Busy indicator until the vault is listed
+        status += f" notes, {progress.bytes / 1e6:.1f} MB"
+        if progress.eta is not None:
+            status += f", {progress.eta:.0f} s left"
+        self.label.setText(status + ")")
+        self.progress_bar.show()
+
+    def finish_loading(self, loader, completed):
+        if loader is not self.loader:
+            return
+        self.loader = None
+        self.progress_bar.hide()
+        self.label.setText(f"Vault: {os.path.basename(self.vault_path)}")
+        if not completed:
+            return
+        PERF.record("vault_load", time.perf_counter() - self.load_started, files=len(self.files))
+        self.start_watching_vault()  # 🔥 start watching for changes
+        self.position_timer.start(POSITION_SAVE_INTERVAL_MS)
+
+    def stop_loading(self):
+        """Cancel a running load; batches it already queued are ignored."""
+        loader, self.loader = self.loader, None
+        self.scene_refresh.stop()
+        if loader is not None:
+            loader.cancel()
+            self.progress_bar.hide()
+
+    def save_positions(self):
+        """Store the current layout in the vault's cache so the next draw starts from it."""
+        viewer = self.graph_viewer
+        if viewer.model is not None:
+            viewer.saved_positions.update(viewer.position_map())
+        if not self.metadata_cache:
+            return
+        # Positions of nodes hidden by a search are kept, those of deleted notes dropped
+        # (unless the vault is still loading and the graph is incomplete)
+        positions = viewer.saved_positions
+        if self.loader is None and self.graph is not None:
+            positions = {name: xy for name, xy in positions.items() if self.graph.has_node(name)}
+        try:
+            self.metadata_cache.save_positions(positions)
+            self.metadata_cache.commit()
+        except sqlite3.Error as e:
+            print(f"[WARN] Could not save the graph layout: {e}")
+
+    def perf_log_path(self):
+        """Where F4 writes timings: the vault's cache folder, else the user cache dir."""
+        if self.metadata_cache:
+            return os.path.join(os.path.dirname(self.metadata_cache.path), PERF_LOG_NAME)
+        folder = os.path.join(os.path.expanduser("~"), ".cache", "hu-sidian")
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, PERF_LOG_NAME)
+
+    def dump_perf_log(self):
+        path = self.perf_log_path()
+        if PERF.dump(path, vault=self.vault_path, nodes=len(self.graph) if self.graph is not None else 0):
+            print(f"Performance timings written to {path}")
 
-        # Step 1: Safely modify the graph data
-        if self.graph.has_node(file_name):
-            neighbors = list(self.graph.neighbors(file_name))
-            self.graph.remove_node(file_name)
-            for neighbor in neighbors:
-                if self.graph.degree(neighbor) == 0:
-                    self.graph.remove_node(neighbor)
-
-        tags, links = self.extract_metadata(file_path)
-        self.graph.add_node(file_name)
+    def handle_file_change(self, file_path):
+        self.handle_file_changes([file_path])
 
+    def handle_file_changes(self, file_paths, first_event=None):
+        """Parse a batch of changed notes (watcher thread) and hand it to the GUI thread."""
+        changes = []
+        for file_path in file_paths:
+            if not file_path.endswith(".md"):
+                continue
+            rel_path = os.path.relpath(file_path, self.vault_path)
+
+            if os.path.exists(file_path):
+                metadata = self.extract_metadata(file_path)
+            else:
+                metadata = None
+                if self.metadata_cache:
+                    self.metadata_cache.remove(rel_path)
+            changes.append((note_name(rel_path), metadata))
+
+        if self.metadata_cache:
+            self.metadata_cache.commit()
+        if changes:
+            self.files_changed.emit(changes, first_event)
+
+    def tag_edges(self, note, tags):
+        """Edges between a note and its tags, as build_graph adds them."""
+        edges = set()
         for tag in tags:
-            tag_node = f"#{tag}"
-            self.graph.add_edge(tag_node, file_name)
-            self.graph.add_edge(tag, file_name)
-
-        for link in links:
-            linked_file = f"{link}.md"
-            if linked_file != file_name:
-                self.graph.add_edge(file_name, linked_file)
-
-        # Step 2: Defer the GUI update to the Qt main thread
-        QTimer.singleShot(0, self.generate_graph)
-
-
+            edges.add((tag, note))
+            edges.add((f"#{tag}", note))
+        return edges
+
+    def link_edges(self, added_links, removed_links):
+        """Apply (source, target) link changes from the LinkIndex to the graph.
+
+        A link edge stays while either note still links to the other. Links
+        from a note to itself get no edge. Returns (added edges, removed edges).
+        """
+        added_edges, removed_edges = set(), set()
+        for source, target in removed_links:
+            if not self.link_index.links_to(target, source) and self.graph.has_edge(source, target):
+                self.graph.remove_edge(source, target)
+                removed_edges.add((source, target))
+        for source, target in added_links:
+            if source != target and not self.graph.has_edge(source, target):
+                self.graph.add_edge(source, target)
+                added_edges.add((source, target))
+        return added_edges, removed_edges
+
+    def apply_file_changes(self, changes, first_event=None):
+        """Patch the graph for a batch of note changes, then update the scene once."""
+        added_nodes, removed_nodes, added_edges, removed_edges = set(), set(), set(), set()
+        for note, metadata in changes:
+            delta = self.patch_graph(note, metadata)
+            added_nodes.update(delta[0])
+            removed_nodes.update(delta[1])
+            added_edges.update(delta[2])
+            removed_edges.update(delta[3])
+
+        # Later changes in the batch may have undone earlier ones
+        added_nodes = [n for n in added_nodes if self.graph.has_node(n)]
+        removed_nodes = [n for n in removed_nodes if not self.graph.has_node(n)]
+        added_edges = [e for e in added_edges if self.graph.has_edge(*e)]
+        removed_edges = [e for e in removed_edges if not self.graph.has_edge(*e)]
+
+        viewer = self.graph_viewer
+        viewer.invalidate_local(
+            added_nodes + removed_nodes + [n for edge in added_edges + removed_edges for n in edge]
+        )
+        if viewer.local_focus is None:
+            viewer.apply_delta(added_nodes, removed_nodes, added_edges, removed_edges)
+        else:
+            viewer.set_graph(self.graph)  # Recompute the neighbourhood; unchanged nodes keep their place
+        if self.search_bar.text().strip():
+            self.apply_search()  # Tags may have changed which notes match
+        if first_event is not None:
+            # From the first file event of the batch to the patched scene
+            PERF.record("change_latency", time.monotonic() - first_event, files=len(changes))
+
+    def patch_graph(self, note, metadata):
+        """Diff a note's old and new tags/links and patch only that part of the graph.
+
+        Links are re-resolved through the LinkIndex, so only notes whose
+        links could name this one are touched. Returns (added nodes,
+        removed nodes, added edges, removed edges).
+        """
+        old_data = self.files.get(note)
+        old_edges = self.tag_edges(note, old_data["tags"]) if old_data else set()
+
+        added_nodes, removed_nodes = [], []
+        if metadata is None:
+            self.files.pop(note, None)
+            if note in self.tag_index.tags_by_note:
+                self.tag_index.remove_note(note)
+            new_edges = set()
+            links = self.link_index.remove_note(note)
+        else:
+            tags, links, aliases = metadata
+            self.files[note] = {"tags": tags, "links": links, "aliases": aliases}
+            self.tag_index.set_note(note, tags)
+            new_edges = self.tag_edges(note, tags)
+            if not self.graph.has_node(note):
+                self.graph.add_node(note)
+                added_nodes.append(note)
+            links = self.link_index.set_note(note, links, aliases)
+        added_edges, removed_edges = self.link_edges(*links)
+
+        for node1, node2 in old_edges - new_edges:
+            if self.graph.has_edge(node1, node2):
+                self.graph.remove_edge(node1, node2)
+                removed_edges.add((node1, node2))
+
+        for node1, node2 in new_edges - old_edges:
+            for node in (node1, node2):
+                if not self.graph.has_node(node):
+                    added_nodes.append(node)
+            if not self.graph.has_edge(node1, node2):
+                self.graph.add_edge(node1, node2)
+                added_edges.add((node1, node2))
+
+        if metadata is None and self.graph.has_node(note):
+            removed_edges.update((note, n) for n in self.graph.neighbors(note))
+            self.graph.remove_node(note)
+            removed_nodes.append(note)
+
+        # Tag nodes disappear with their last note
+        for edge in removed_edges:
+            for node in edge:
+                if not node.endswith(".md") and self.graph.has_node(node) and self.graph.degree(node) == 0:
+                    self.graph.remove_node(node)
+                    removed_nodes.append(node)
+
+        return added_nodes, removed_nodes, added_edges, removed_edges
 
     def start_watching_vault(self):
         if not self.vault_path:
             return
 
+        from watchdog.observers import Observer  # Imported here to keep startup fast
+
+        self.stop_watching_vault()
         self.observer = Observer()
-        self.event_handler = VaultChangeHandler(self)
+        self.event_handler = VaultChangeHandler(self, quiet_window=self.change_quiet_window)
         self.observer.schedule(self.event_handler, self.vault_path, recursive=True)
 
-        thread = threading.Thread(target=self.observer.start, daemon=True)
-        thread.start()
+        self.observer.daemon = True
+        self.observer.start()  # Runs its own thread; starting it here lets a quick close join it
 
-    def closeEvent(self, event):
+    def stop_watching_vault(self):
         if hasattr(self, 'observer') and self.observer:
             self.observer.stop()
             self.observer.join()
+            self.event_handler.cancel()
+            self.observer = None
+
+    def closeEvent(self, event):
+        self.position_timer.stop()
+        self.save_positions()
+        self.stop_loading()
+        self.stop_watching_vault()
+        self.graph_viewer.stop_physics()
+        PERF.close_log()
+        if self.metadata_cache:
+            self.metadata_cache.close()
+            self.metadata_cache = None
+        if self.scan_pool:
+            self.scan_pool.shutdown(cancel_futures=True)
+            self.scan_pool = None
         super().closeEvent(event)
 
+    def open_metadata_cache(self):
+        """Open the parse cache for the current vault, closing any previous one."""
+        if self.metadata_cache:
+            self.metadata_cache.close()
+            self.metadata_cache = None
+        try:
+            self.metadata_cache = MetadataCache(self.vault_path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[WARN] Metadata cache unavailable, parsing every file: {e}")
+
 
     def extract_metadata(self, file_path):
-        """Extracts tags and wiki-style links from Markdown files."""
+        """Extracts tags, wiki-style links and aliases from a Markdown file.
+
+        With a metadata cache open, files whose mtime and size are unchanged
+        are not read at all. Anything else is read once, hashing and parsing
+        in the same pass; if the hash shows the content did not change, the
+        cached result is kept and only the new mtime is stored.
+        """
+        cache = self.metadata_cache
+        rel_path = os.path.relpath(file_path, self.vault_path) if cache else None
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            stat = os.stat(file_path)
         except (PermissionError, FileNotFoundError):
             # File is likely still being written or was moved/deleted
             print(f"[WARN] Skipped file (unreadable): {file_path}")
-            return set(), set()
-    
-        tags = set(re.findall(r'#(\w+)', content))
-        links = set(re.findall(r'\[\[([^\]]+)\]\]', content))
-        return tags, links
-
+            return set(), set(), set()
+        if cache:
+            cached = cache.get(rel_path, stat)
+            if cached is not None:
+                return cached
+
+        result = read_metadata(file_path)
+        if result is None:
+            return set(), set(), set()
+        *metadata, digest = result
+        if cache:
+            cached = cache.get_by_hash(rel_path, digest)
+            if cached is not None:
+                cache.put(rel_path, stat, digest, *cached)  # Remember the new mtime
+                return cached
+            cache.put(rel_path, stat, digest, *metadata)
+        return tuple(metadata)
+
+    def load_notes(self, notes):
+        """Return (tags, links, aliases) for each scanned note, in the same order.
+
+        Cache hits are used as-is; everything else is parsed by the scan pool
+        and written back to the cache.
+        """
+        cache = self.metadata_cache
+        results = [None] * len(notes)
+        pending = []
+        for i, (rel_path, _, stat) in enumerate(notes):
+            cached = cache.get(rel_path, stat) if cache else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        parsed = self.parse_files([notes[i][1] for i in pending])
+        for i, result in zip(pending, parsed):
+            if result is None:
+                results[i] = (set(), set(), set())
+                continue
+            *metadata, digest = result
+            results[i] = tuple(metadata)
+            if cache:
+                rel_path, _, stat = notes[i]
+                cache.put(rel_path, stat, digest, *metadata)
+        return results
+
+    def parse_files(self, file_paths):
+        """Parse files in chunks on the scan pool; results keep input order."""
+        workers = self.scan_workers or os.cpu_count() or 1
+        if workers <= 1 or len(file_paths) <= SCAN_CHUNK_SIZE:
+            return read_metadata_chunk(file_paths)
+
+        if self.scan_pool is None or self.scan_pool_workers != workers:
+            if self.scan_pool:
+                self.scan_pool.shutdown()
+            self.scan_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(SCAN_START_METHOD))
+            self.scan_pool_workers = workers
+
+        chunks = [file_paths[i:i + SCAN_CHUNK_SIZE] for i in range(0, len(file_paths), SCAN_CHUNK_SIZE)]
+        return [result for chunk in self.scan_pool.map(read_metadata_chunk, chunks) for result in chunk]
 
     def build_graph(self):
         """Scans .md files and builds a graph with relationships."""
-        self.graph.clear()
-        files = {}
+        self.reset_graph()
+        for batch in VaultLoader(self).batches():
+            self.add_notes(*batch)
 
-        if not self.vault_path:
-            return
-
-        # Scan .md files
-        print("\n\n")
-        for root, _, filenames in os.walk(self.vault_path):
-            for file in filenames:
-                if file.endswith(".md"):
-                    file_path = os.path.join(root, file)
-                    tags, links = self.extract_metadata(file_path)
-
-                    # Store node with filepath
-                    self.graph.add_node(file, label=file)
-                    files[file] = {"tags": tags, "links": links}
-                    print(f"node: {file}, has tags:\n{tags} and links:\n{links}")
-                    # Add tag relations
-                    for tag in tags:
-                        tag_node = f"#{tag}"
-                        # print(tag_node)
-                        # print(file)
-                        self.graph.add_edge(tag, file)
-                        self.graph.add_edge(tag_node, file)
-
-        # Add file-to-file links
-        for file, data in files.items():
-            for link in data["links"]:
-                linked_file = f"{link}.md"
-                if linked_file in files:
-                    self.graph.add_edge(file, linked_file)
+    def reset_graph(self):
+        if self.graph is None:
+            self.graph = VaultGraph()
+        self.graph.clear()
+        self.tag_index.clear()
+        self.link_index.clear()
+        self.files = {}
+
+    def add_notes(self, notes, edges, links):
+        """Add a batch of notes, tag edges and link changes planned by the VaultLoader.
+
+        Returns (added nodes, added edges, removed edges); an edge is
+        removed when a link now resolves to a better match.
+        """
+        graph, files = self.graph, self.files
+        added_nodes, added_edges, removed_edges = [], [], []
+        for note, tags, note_links, aliases in notes:
+            # Store node with filepath
+            if not graph.has_node(note):
+                added_nodes.append(note)
+            graph.add_node(note)
+            files[note] = {"tags": tags, "links": note_links, "aliases": aliases}
+            self.tag_index.set_note(note, tags)
+
+        # Note-to-note links, including earlier links that only now resolve
+        for source, target, linked in links:
+            if linked and not graph.has_edge(source, target):
+                graph.add_edge(source, target)
+                added_edges.append((source, target))
+            elif not linked and graph.has_edge(source, target):
+                graph.remove_edge(source, target)
+                removed_edges.append((source, target))
+
+        for node1, node2 in edges:
+            for node in (node1, node2):
+                if not graph.has_node(node):
+                    added_nodes.append(node)
+            if not graph.has_edge(node1, node2):
+                graph.add_edge(node1, node2)
+                added_edges.append((node1, node2))
+        return added_nodes, added_edges, removed_edges
 
     # def generate_graph(self):
     #     self.build_graph()
     #     self.graph_viewer.draw_graph()
 
     def generate_graph(self):
-        self.build_graph()
+        if self.vault_path:
+            self.open_vault(self.vault_path)
 
+    def apply_search(self):
+        """Filter the shown graph by the tags in the search bar, without redrawing it."""
+        if self.graph is None:
+            return
         search_input = self.search_bar.text().strip()
         if not search_input:
-            self.graph_viewer.draw_graph()
+            self.graph_viewer.set_filter(None)
             return
 
-        # Extract tags from the search bar (space-separated #tags)
-        search_tags = {tag.strip() for tag in search_input.split() if tag.startswith("#")}
-        matching_nodes = set()
-
-        for node in self.graph.nodes:
-            if node.startswith("#") and node in search_tags:
-                matching_nodes.add(node)
-                # Include connected files
-                for neighbor in self.graph.neighbors(node):
-                    matching_nodes.add(neighbor)
-            elif not node.startswith("#"):
-                # Check if this file node is connected to any searched tag
-                for tag in search_tags:
-                    if self.graph.has_edge(tag, node) or self.graph.has_edge(tag[1:], node):  # Also try tag without '#'
-                        matching_nodes.add(node)
-                        matching_nodes.add(tag)
-                        matching_nodes.add(tag[1:])  # e.g., #tag and tag
-
-        # Filter the graph to only include matching nodes
-        subgraph = self.graph.subgraph(matching_nodes).copy()
-        self.graph_viewer.graph = subgraph
-        self.graph_viewer.draw_graph()
+        with PERF.measure("search"):
+            notes, tags = self.tag_index.search(search_input)
+            matching_nodes = set(notes)
+            for tag in tags:
+                matching_nodes.add(f"#{tag}")
+                matching_nodes.add(tag)
+            self.graph_viewer.set_filter(matching_nodes)
 
 
 if __name__ == "__main__":
-    app = QApplication([])
+    app = QApplication(sys.argv)
     window = ObsidianGraphApp()
     window.show()
+    if len(sys.argv) > 1:
+        # A vault given on the command line starts loading once the window is up
+        QTimer.singleShot(0, lambda: window.open_vault(os.path.abspath(sys.argv[1])))
     app.exec()
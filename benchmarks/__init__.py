@@ -0,0 +1,5 @@
+"""Headless benchmarks for Hu-sidian.
+
+Run ``python -m benchmarks.run`` from the repository root; see
+``benchmarks/run.py`` for the options.
+"""
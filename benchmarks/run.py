@@ -0,0 +1,420 @@
+"""Time each stage of the Hu-sidian pipeline on synthetic vaults.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.run --sizes 1000 --compare results.json
+
+Qt runs with ``QT_QPA_PLATFORM=offscreen`` unless the variable is already
+set, so no display is needed. Results are written as JSON and can be
+compared between commits with ``--compare``.
+"""
+import argparse
+import datetime
+import gc
+import importlib
+import importlib.abc
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from benchmarks.synthetic_vault import generate_vault
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(REPO_ROOT, "Hu-sidian v3.py")
+
+STAGES = [
+    "scan", "extract_metadata", "build_graph", "build_graph_cached", "graph_store",
+    "spring_layout", "multilevel_layout", "draw_graph", "physics_tick", "draw_graph_warm", "draw_graph_filtered",
+    "filter_toggle", "local_graph", "search",
+]
+# nx.spring_layout is quadratic; these stages are skipped above --layout-limit
+# (draw_graph switches to multilevel_layout from MULTILEVEL_MIN_NODES, so it always runs)
+LAYOUT_STAGES = {"spring_layout"}
+SEARCH_LOOPS = 100
+QUALITY_SOURCES = 20  # Shortest-path roots sampled for the hop-distance correlation
+
+
+class AppFinder(importlib.abc.MetaPathFinder):
+    """Finds the app script as ``husidian`` (its file name is not a valid module name).
+
+    Installed on import, so scan workers started with forkserver or spawn,
+    which re-import this module, can unpickle the app's worker functions.
+    """
+
+    def find_spec(self, name, path, target=None):
+        if name == "husidian":
+            return importlib.util.spec_from_file_location(name, APP_SCRIPT)
+        return None
+
+
+sys.meta_path.append(AppFinder())
+
+
+def load_app_module():
+    """Import the app script."""
+    return importlib.import_module("husidian")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def place_randomly(module, viewer, graph, seed):
+    """Like draw_graph, but with random positions instead of spring_layout."""
+    rng = random.Random(seed)
+    viewer.graph = graph
+    viewer.scene.clear()
+    viewer.nodes.clear()
+    viewer.edges.clear()
+    viewer.dragged_nodes.clear()
+    viewer.node_list, viewer.edge_list, viewer.model = [], [], None
+    viewer.painter_item = None
+    if viewer.render_mode == "batched":
+        viewer.painter_item = module.GraphPainterItem(viewer)
+        viewer.scene.addItem(viewer.painter_item)
+    positions = {}
+    for node in graph.nodes:
+        positions[node] = (rng.uniform(-5000, 5000), rng.uniform(-5000, 5000))
+        viewer.add_node_item(node, *positions[node])
+    for node1, node2 in graph.edges:
+        viewer.add_edge_item(node1, node2)
+    viewer.rebuild_model(positions)
+
+
+def layout_quality(graph, positions, link_distance, seed=0):
+    """Scale-free quality measures of a layout (node -> (x, y)).
+
+    edge_length_cv: spread of edge lengths relative to their mean (lower is
+    more uniform). distance_correlation: Pearson correlation between
+    on-screen distance and shortest-path distance (edges weighted by
+    ``link_distance(u, v)``) from sampled roots; higher keeps
+    neighbourhoods together. overlap: share of nodes with another node
+    closer than a tenth of the median edge length (needs scipy).
+    """
+    import numpy as np
+    nx = sys.modules["husidian"].nx
+    names = list(graph.nodes)
+    index = {name: i for i, name in enumerate(names)}
+    xy = np.array([positions[name] for name in names], dtype=float)
+    edges = np.array([(index[u], index[v]) for u, v in graph.edges], dtype=int).reshape(-1, 2)
+    lengths = np.hypot(*(xy[edges[:, 0]] - xy[edges[:, 1]]).T)
+    quality = {"edge_length_cv": float(lengths.std() / lengths.mean()) if len(lengths) else None}
+
+    rng = random.Random(seed)
+    path_lengths, distances = [], []
+    weight = lambda u, v, _: link_distance(u, v)
+    nx_graph = graph.to_networkx()
+    for root in rng.sample(names, min(QUALITY_SOURCES, len(names))):
+        for node, length in nx.single_source_dijkstra_path_length(nx_graph, root, weight=weight).items():
+            if node != root:
+                path_lengths.append(length)
+                distances.append(np.hypot(*(xy[index[node]] - xy[index[root]])))
+    quality["distance_correlation"] = (
+        float(np.corrcoef(path_lengths, distances)[0, 1]) if len(set(path_lengths)) > 1 else None
+    )
+
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        quality["overlap"] = None
+    else:
+        nearest, _ = cKDTree(xy).query(xy, k=2)
+        quality["overlap"] = float(np.mean(nearest[:, 1] < 0.1 * np.median(lengths))) if len(lengths) else None
+    return {name: round(value, 4) if value is not None else None for name, value in quality.items()}
+
+
+class StageRunner:
+    """Runs the stages for one vault size, sharing state between them."""
+
+    def __init__(self, module, vault_path, args):
+        self.module = module
+        self.vault_path = vault_path
+        self.args = args
+        self.app = module.ObsidianGraphApp(threaded_physics=False)
+        self.app.vault_path = vault_path
+        self.app.scan_workers = args.workers
+        self.viewer = self.app.graph_viewer
+        self.viewer.render_mode = args.render_mode
+        self.viewer.resize(1000, 700)
+        self.notes = None
+
+    def close(self):
+        self.app.close()
+
+    def run(self, stage):
+        """Time a stage; stages may return (seconds, extra fields) instead of seconds."""
+        runs, extra = [], {}
+        for _ in range(self.args.repeat):
+            result = getattr(self, f"stage_{stage}")()
+            if isinstance(result, tuple):
+                result, extra = result
+            runs.append(result)
+        return {"seconds": min(runs), "runs": runs, **extra}
+
+    def ensure_graph(self):
+        """Build the graph first when a stage runs without the build_graph stage."""
+        if self.app.graph is None or not self.app.graph.number_of_nodes():
+            self.app.build_graph()
+
+    @staticmethod
+    def timed(function, *args):
+        started = time.perf_counter()
+        function(*args)
+        return time.perf_counter() - started
+
+    def stage_scan(self):
+        started = time.perf_counter()
+        self.notes = self.module.scan_vault(self.vault_path)
+        return time.perf_counter() - started
+
+    def stage_extract_metadata(self):
+        notes = self.notes or self.module.scan_vault(self.vault_path)
+        self.app.metadata_cache = None
+        started = time.perf_counter()
+        for _, file_path, _ in notes:
+            self.app.extract_metadata(file_path)
+        return time.perf_counter() - started
+
+    def stage_build_graph(self):
+        self.app.metadata_cache = None
+        return self.timed(self.app.build_graph)
+
+    def stage_build_graph_cached(self):
+        self.app.open_metadata_cache()
+        self.app.build_graph()  # Warm the cache
+        self.app.open_metadata_cache()
+        elapsed = self.timed(self.app.build_graph)
+        self.app.metadata_cache.close()
+        self.app.metadata_cache = None
+        return elapsed
+
+    def stage_graph_store(self):
+        """Memory and iteration speed of the VaultGraph against a networkx.Graph of the same vault."""
+        self.ensure_graph()
+        nx = self.module.nx
+        nodes, edges = self.app.graph.nodes, self.app.graph.edges
+
+        def build_networkx():
+            graph = nx.Graph()
+            graph.add_nodes_from(nodes)
+            graph.add_edges_from(edges)
+            return graph
+
+        stores = {
+            "vault_graph": (lambda: self.module.VaultGraph(nodes, edges), self.module.GraphModel.from_graph),
+            "networkx": (build_networkx, lambda graph: self.module.GraphModel(graph.nodes, graph.edges)),
+        }
+        extra = {}
+        for name, (build, to_model) in stores.items():
+            build()  # Finishes any lazy import before timing and tracing
+            build_seconds = self.timed(build)
+            gc.collect()
+            tracemalloc.start()
+            graph = build()
+            size, _ = tracemalloc.get_traced_memory()  # Node names are shared, so this is the structure only
+            tracemalloc.stop()
+            seconds = {
+                "build": build_seconds,
+                "neighbors": self.timed(lambda: [sum(1 for _ in graph.neighbors(node)) for node in graph]),
+                "edges": self.timed(lambda: sum(1 for _ in graph.edges)),
+                "model": self.timed(lambda: to_model(graph)),
+            }
+            extra[name] = {"megabytes": round(size / 1e6, 2), **{
+                f"{step}_seconds": round(value, 6) for step, value in seconds.items()
+            }}
+        return extra["vault_graph"]["neighbors_seconds"], extra
+
+    def stage_spring_layout(self):
+        self.ensure_graph()
+        nx_graph = self.app.graph.to_networkx()
+        started = time.perf_counter()
+        pos = self.module.nx.spring_layout(nx_graph, k=self.viewer.link_distance / 1000, scale=500)
+        elapsed = time.perf_counter() - started
+        quality = layout_quality(self.app.graph, pos, self.viewer.get_link_distance, self.args.seed)
+        return elapsed, {"quality": quality}
+
+    def stage_multilevel_layout(self):
+        self.ensure_graph()
+        graph = self.app.graph
+        model = self.module.GraphModel.from_graph(graph)
+        rest_lengths = [self.viewer.get_link_distance(u, v) for u, v in graph.edges]
+        started = time.perf_counter()
+        pos = self.module.multilevel_layout(
+            model.edges, rest_lengths, len(model), seed=self.args.seed, **self.viewer.force_parameters()
+        )
+        elapsed = time.perf_counter() - started
+        positions = dict(zip(model.names, pos.tolist()))
+        quality = layout_quality(graph, positions, self.viewer.get_link_distance, self.args.seed)
+        return elapsed, {"quality": quality}
+
+    def stage_draw_graph(self):
+        self.ensure_graph()
+        self.viewer.graph = self.app.graph
+        return self.timed(self.viewer.draw_graph)
+
+    def stage_physics_tick(self):
+        self.ensure_graph()
+        if self.viewer.model is None or len(self.viewer.node_list) != self.app.graph.number_of_nodes():
+            place_randomly(self.module, self.viewer, self.app.graph, self.args.seed)
+        self.viewer.wake(1.0)
+        self.viewer.update_physics()  # First tick pays for array warm-up
+        return self.timed(self.viewer.update_physics)
+
+    def stage_draw_graph_warm(self):
+        """Redraw starting from the positions left by the previous stages."""
+        self.ensure_graph()
+        if self.viewer.model is None:
+            place_randomly(self.module, self.viewer, self.app.graph, self.args.seed)
+        return self.timed(self.viewer.draw_graph)
+
+    def stage_draw_graph_filtered(self):
+        """Redraw with every other note filtered out, then with the full graph again."""
+        self.ensure_graph()
+        if self.viewer.model is None:
+            place_randomly(self.module, self.viewer, self.app.graph, self.args.seed)
+        notes = [node for node in self.app.graph if node.endswith(".md")]
+        subgraph = self.app.graph.subgraph(set(self.app.graph) - set(notes[::2])).copy()
+        started = time.perf_counter()
+        self.viewer.graph = subgraph
+        self.viewer.draw_graph()
+        self.viewer.graph = self.app.graph
+        self.viewer.draw_graph()
+        return time.perf_counter() - started
+
+    def stage_filter_toggle(self):
+        """Hide every other note with a search filter, then show everything again."""
+        self.ensure_graph()
+        if self.viewer.model is None:
+            place_randomly(self.module, self.viewer, self.app.graph, self.args.seed)
+        notes = [node for node in self.app.graph if node.endswith(".md")]
+        matching = set(self.app.graph) - set(notes[::2])
+        started = time.perf_counter()
+        self.viewer.set_filter(matching)
+        self.viewer.set_filter(None)
+        return time.perf_counter() - started
+
+    def stage_local_graph(self):
+        """Switch to the 2-hop local graph of the best linked note, then back to the whole vault."""
+        self.ensure_graph()
+        if self.viewer.model is None:
+            place_randomly(self.module, self.viewer, self.app.graph, self.args.seed)
+        graph = self.app.graph
+        self.viewer.source_graph = self.viewer.graph = graph
+        focus = max((node for node in graph if node.endswith(".md")), key=graph.degree)
+        self.viewer.reset_local()
+        self.viewer.local_depth = 2
+        self.viewer.local_mode = True
+        started = time.perf_counter()
+        self.viewer.select_node(focus)
+        elapsed = time.perf_counter() - started
+        local_nodes = self.viewer.graph.number_of_nodes()
+        started = time.perf_counter()
+        self.viewer.local_nodes(focus)  # Cached
+        cached = time.perf_counter() - started
+        started = time.perf_counter()
+        self.viewer.set_local_mode(False)
+        back = time.perf_counter() - started
+        self.viewer.reset_local()
+        self.viewer.local_depth = self.module.LOCAL_GRAPH_DEPTH
+        return elapsed, {"local_nodes": local_nodes, "cached_seconds": cached, "back_seconds": back}
+
+    def stage_search(self):
+        self.ensure_graph()
+        index = self.app.tag_index
+        popular = sorted(index.notes_by_tag, key=lambda tag: -len(index.notes_by_tag[tag]))[:2]
+        query = " ".join(f"#{tag}" for tag in popular)
+        started = time.perf_counter()
+        for _ in range(SEARCH_LOOPS):
+            index.search(query)
+        return (time.perf_counter() - started) / SEARCH_LOOPS
+
+
+def compare(baseline, current):
+    print(f"{'notes':>8} {'stage':<20} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for size, stages in current["results"].items():
+        for stage, result in stages.items():
+            old = baseline["results"].get(size, {}).get(stage, {})
+            if "seconds" not in result or "seconds" not in old:
+                continue
+            ratio = result["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+            print(f"{size:>8} {stage:<20} {old['seconds']:>10.6f} {result['seconds']:>10.6f} {ratio:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage, the fastest is reported")
+    parser.add_argument("--layout-limit", type=int, default=10000,
+                        help="skip spring_layout above this many notes")
+    parser.add_argument("--workers", type=int, default=None, help="scan worker processes (default: all cores)")
+    parser.add_argument("--render-mode", choices=["items", "batched"], default="items")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--vault-dir", help="keep generated vaults here instead of a temp dir")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    module = load_app_module()
+    from PyQt6.QtWidgets import QApplication
+    qt_app = QApplication.instance() or QApplication([])
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "render_mode": args.render_mode,
+        },
+        "results": {},
+    }
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vault_path = os.path.join(args.vault_dir or temp_dir, f"vault-{size}-{args.seed}")
+            if not os.path.isdir(vault_path):
+                print(f"Generating {size} notes in {vault_path}")
+                generate_vault(vault_path, notes=size, seed=args.seed)
+
+            runner = StageRunner(module, vault_path, args)
+            results = report["results"][str(size)] = {}
+            for stage in args.stages:
+                if stage in LAYOUT_STAGES and size > args.layout_limit:
+                    results[stage] = {"skipped": f"above --layout-limit {args.layout_limit}"}
+                    continue
+                results[stage] = runner.run(stage)
+                details = {key: value for key, value in results[stage].items() if key not in ("seconds", "runs")}
+                print(f"{size:>8} {stage:<20} {results[stage]['seconds']:.6f}s" + "".join(f"  {value}" for value in details.values()))
+            runner.close()
+            qt_app.processEvents()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
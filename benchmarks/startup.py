@@ -0,0 +1,146 @@
+"""Measure how fast Hu-sidian starts and opens a vault.
+
+Usage (from the repository root):
+
+    python -m benchmarks.startup --sizes 1000 10000 --output startup.json
+
+Every run starts a fresh interpreter that loads the app, shows the window
+and opens a synthetic vault, as ``python "Hu-sidian v3.py" VAULT`` does.
+Times are seconds since the process was launched:
+
+    imported           the app module is imported
+    first_pixel        the main window has been painted
+    first_interactive  the first chunk of notes is on screen and the event
+                       loop is free again
+    loaded             the whole vault is loaded
+
+The first run of each size starts without a metadata cache or saved
+layout ("cold"); the fastest of the remaining runs is reported as "warm".
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.run import REPO_ROOT, git_commit, load_app_module
+from benchmarks.synthetic_vault import generate_vault
+
+EVENTS = ["imported", "first_pixel", "first_interactive", "loaded"]
+POLL_MS = 5
+# The app prints from other threads, so an event may share its line with other output
+EVENT_PATTERN = re.compile(r'\{"event": "(\w+)", "time": ([\d.]+)\}')
+
+
+def child(vault_path, timeout):
+    """Runs in the measured process; prints one JSON line per event."""
+    def emit(event):
+        print(json.dumps({"event": event, "time": time.time()}), flush=True)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    module = load_app_module()
+    emit("imported")
+
+    from PyQt6.QtCore import QEvent, QObject, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication([])
+    window = module.ObsidianGraphApp()
+    seen = set()
+
+    def once(event):
+        if event not in seen:
+            seen.add(event)
+            emit(event)
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                QTimer.singleShot(0, lambda: once("first_pixel"))  # After the paint has finished
+            return False
+
+    watcher = PaintWatcher()
+    window.installEventFilter(watcher)
+    window.show()
+    QTimer.singleShot(0, lambda: window.open_vault(vault_path))
+
+    def poll():
+        if window.graph_viewer.node_list:
+            once("first_interactive")
+        if window.load_started is not None and window.loader is None:
+            once("first_interactive")
+            once("loaded")
+            window.close()
+            app.quit()
+
+    poller = QTimer()
+    poller.timeout.connect(poll)
+    poller.start(POLL_MS)
+    QTimer.singleShot(int(timeout * 1000), app.quit)
+    app.exec()
+
+
+def measure(vault_path, timeout):
+    started = time.time()
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", vault_path, "--timeout", str(timeout)],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    times = {}
+    for event, seconds in EVENT_PATTERN.findall(process.stdout):
+        times[event] = round(float(seconds) - started, 4)
+    if process.returncode or "loaded" not in times:
+        print(f"[WARN] Run did not finish loading (exit code {process.returncode})")
+        print(process.stderr[-2000:])
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size, the first one cold")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600, help="seconds before a run is abandoned")
+    parser.add_argument("--vault-dir", help="keep generated vaults here instead of a temp dir")
+    parser.add_argument("--output", default="startup-results.json")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.timeout)
+        return
+
+    report = {
+        "meta": {"commit": git_commit(), "python": sys.version.split()[0], "seed": args.seed},
+        "results": {},
+    }
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vault_path = os.path.join(args.vault_dir or temp_dir, f"vault-{size}-{args.seed}")
+            if not os.path.isdir(vault_path):
+                print(f"Generating {size} notes in {vault_path}")
+                generate_vault(vault_path, notes=size, seed=args.seed)
+            shutil.rmtree(os.path.join(vault_path, ".hu-sidian"), ignore_errors=True)
+
+            runs = [measure(vault_path, args.timeout) for _ in range(args.repeat)]
+            result = {"cold": runs[0]}
+            if len(runs) > 1:
+                result["warm"] = {
+                    event: min(run[event] for run in runs[1:] if event in run)
+                    for event in EVENTS if any(event in run for run in runs[1:])
+                }
+            report["results"][str(size)] = result
+            for kind, times in result.items():
+                print(f"{size:>8} {kind:<5} " + "  ".join(f"{e} {times.get(e, float('nan')):.3f}s" for e in EVENTS))
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Seeded generator for synthetic Obsidian vaults.
+
+The same seed and settings always produce the same vault, so benchmark
+runs on different commits measure the same input.
+"""
+import argparse
+import os
+import random
+
+WORDS = (
+    "graph note idea link project meeting draft summary research question "
+    "answer reading book paper code design review plan task daily weekly"
+).split()
+
+
+def zipf_weights(count, exponent):
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def folder_for(rng, depth, fanout):
+    return os.path.join(*(f"folder{rng.randrange(fanout)}" for _ in range(depth))) if depth else ""
+
+
+def generate_vault(path, notes=1000, tags=200, tags_per_note=3, tag_skew=1.1,
+                   links_per_note=4, folder_depth=3, folder_fanout=4,
+                   frontmatter_ratio=0.3, seed=0):
+    """Write a synthetic vault to ``path`` and return the list of note paths.
+
+    Tag popularity follows a Zipf distribution with exponent ``tag_skew``;
+    each note links to ``links_per_note`` other notes on average and lives
+    between 0 and ``folder_depth`` folders deep.
+    """
+    rng = random.Random(seed)
+    tag_names = [f"tag{i}" for i in range(tags)]
+    weights = zipf_weights(tags, tag_skew)
+    names = [f"note{i:06d}" for i in range(notes)]
+
+    written = []
+    for name in names:
+        folder = os.path.join(path, folder_for(rng, rng.randint(0, folder_depth), folder_fanout))
+        os.makedirs(folder, exist_ok=True)
+
+        note_tags = set(rng.choices(tag_names, weights, k=max(0, round(rng.gauss(tags_per_note, 1)))))
+        link_count = max(0, round(rng.expovariate(1 / links_per_note))) if links_per_note else 0
+        note_links = {rng.choice(names) for _ in range(link_count)}
+
+        lines = []
+        if note_tags and rng.random() < frontmatter_ratio:
+            lines += ["---", f"tags: [{', '.join(sorted(note_tags))}]", "---"]
+            inline_tags = []
+        else:
+            inline_tags = sorted(note_tags)
+        lines.append(f"# {name}")
+        for _ in range(rng.randint(2, 8)):
+            sentence = " ".join(rng.choices(WORDS, k=rng.randint(6, 16)))
+            if inline_tags:
+                sentence += f" #{inline_tags.pop()}"
+            if note_links and rng.random() < 0.7:
+                sentence += f" [[{note_links.pop()}]]"
+            lines.append(sentence)
+        lines += [f"#{tag}" for tag in inline_tags]
+        lines += [f"- [[{link}]]" for link in sorted(note_links)]
+
+        file_path = os.path.join(folder, f"{name}.md")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        written.append(file_path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path")
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--tags", type=int, default=200)
+    parser.add_argument("--tags-per-note", type=float, default=3)
+    parser.add_argument("--tag-skew", type=float, default=1.1)
+    parser.add_argument("--links-per-note", type=float, default=4)
+    parser.add_argument("--folder-depth", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_vault(
+        args.path, notes=args.notes, tags=args.tags, tags_per_note=args.tags_per_note,
+        tag_skew=args.tag_skew, links_per_note=args.links_per_note,
+        folder_depth=args.folder_depth, seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Hu-sidian v3.py")
+
+
+@pytest.fixture(scope="session")
+def husidian():
+    """The app script as a module (its file name is not a valid module name)."""
+    if "husidian" not in sys.modules:
+        spec = importlib.util.spec_from_file_location("husidian", APP_SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["husidian"] = module
+        spec.loader.exec_module(module)
+    return sys.modules["husidian"]
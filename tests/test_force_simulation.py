@@ -0,0 +1,54 @@
+import numpy as np
+
+
+def star(husidian, leaves, seed=0):
+    """A tag hub with ``leaves`` notes around it at their rest length, plus a little noise."""
+    rng = np.random.default_rng(seed)
+    angle = rng.uniform(0, 2 * np.pi, leaves)
+    positions = np.vstack([[0, 0], np.column_stack([np.cos(angle), np.sin(angle)]) * 100])
+    positions += rng.normal(0, 5, positions.shape)
+    edges = [(0, leaf) for leaf in range(1, leaves + 1)]
+    simulation = husidian.ForceSimulation(positions, edges, np.full(leaves, 100.0))
+    simulation.max_speed = 100.0  # As rebuild_model sets it
+    return simulation
+
+
+def spread(positions):
+    return np.abs(positions - positions.mean(axis=0)).max()
+
+
+def test_hub_stays_bounded_while_held_warm(husidian):
+    simulation = star(husidian, 2000)
+    simulation.alpha = simulation.alpha_target = husidian.REHEAT_ALPHA  # As during a drag
+    for _ in range(100):
+        simulation.step()
+    assert np.isfinite(simulation.positions).all()
+    assert spread(simulation.positions) < 500
+
+
+def test_reheated_layout_settles_again(husidian):
+    simulation = star(husidian, 500)
+    for _ in range(300):
+        simulation.step()
+    settled = spread(simulation.positions)
+    for _ in range(3):
+        simulation.reheat()
+        while simulation.step():
+            pass
+    assert simulation.at_rest()
+    assert spread(simulation.positions) < 2 * settled
+
+
+def test_coincident_nodes_are_not_thrown_out(husidian):
+    positions = np.zeros((50, 2)) + np.random.default_rng(0).normal(0, 1e-3, (50, 2))
+    simulation = husidian.ForceSimulation(positions, np.zeros((0, 2)), [])
+    simulation.velocities[:] = 0
+    simulation.step()
+    assert spread(simulation.positions) < simulation.repel_cutoff
+
+
+def test_saved_positions_skip_diverged_nodes(husidian, tmp_path):
+    cache = husidian.MetadataCache(str(tmp_path))
+    cache.save_positions({"a.md": (1.0, 2.0), "b.md": (float("nan"), 0.0), "c.md": (1e23, 5.0), "d.md": (0.0, float("inf"))})
+    assert cache.load_positions() == {"a.md": (1.0, 2.0)}
+    cache.close()
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+FOLDERS = ["", "a/", "b/", "a/c/", "B/"]
+NAMES = ["x", "y", "Z", "z", "note"]
+LINKS = ["x", "X", "y", "z", "note", "a/x", "c/z", "A/C/Z", "b/y", "b\\x", "/y/", "al1", "AL2", "missing"]
+ALIASES = ["al1", "Al2", "y", "zz"]
+
+
+def brute_force_links(notes):
+    """Every (source, target) link, resolved by scanning all notes as LinkIndex documents."""
+    def resolve(source, key):
+        if "/" in key:
+            candidates = [path for path in notes if ("/" + path[:-3].casefold()).endswith("/" + key)]
+        else:
+            candidates = [path for path in notes if path[:-3].casefold().rpartition("/")[2] == key]
+            if not candidates:
+                candidates = [path for path in notes if key in {alias.casefold() for alias in notes[path][1]}]
+        if not candidates:
+            return None
+        folder = source.rpartition("/")[0]
+        return min(candidates, key=lambda path: (path.rpartition("/")[0] != folder, path.count("/"), path))
+
+    links = set()
+    for source, (targets, _) in notes.items():
+        for link in targets:
+            target = resolve(source, link.replace("\\", "/").strip("/").casefold())
+            if target is not None:
+                links.add((source, target))
+    return links
+
+
+def indexed_links(index):
+    return {(source, target) for target, sources in index.backlinks.items() for source in sources}
+
+
+def random_note(rng):
+    return (set(rng.sample(LINKS, rng.randint(0, 4))), set(rng.sample(ALIASES, rng.randint(0, 1))))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_index_matches_rebuild_and_brute_force(husidian, seed):
+    rng = random.Random(seed)
+    paths = [folder + name + ".md" for folder in FOLDERS for name in NAMES]
+    index = husidian.LinkIndex()
+    notes = {}
+    links = set()  # Kept up to date from the deltas alone
+
+    for _ in range(150):
+        operation = rng.choice(["create", "modify", "delete", "rename"] if notes else ["create"])
+        if operation in ("create", "modify"):
+            path = rng.choice(paths) if operation == "create" else rng.choice(sorted(notes))
+            notes[path] = random_note(rng)
+            delta = [index.set_note(path, *notes[path])]
+        elif operation == "delete":
+            path = rng.choice(sorted(notes))
+            del notes[path]
+            delta = [index.remove_note(path)]
+        else:
+            path, new_path = rng.choice(sorted(notes)), rng.choice(paths)
+            if new_path in notes:
+                continue
+            notes[new_path] = notes.pop(path)
+            delta = [index.remove_note(path), index.set_note(new_path, *notes[new_path])]
+
+        for added, removed in delta:
+            assert not set(added) & links
+            assert set(removed) <= links
+            links = (links - set(removed)) | set(added)
+
+        expected = brute_force_links(notes)
+        assert links == expected
+        assert indexed_links(index) == expected
+
+    rebuilt = husidian.LinkIndex()
+    for path in rng.sample(sorted(notes), len(notes)):
+        rebuilt.set_note(path, *notes[path])
+    assert indexed_links(rebuilt) == indexed_links(index)
+    assert rebuilt.by_name == index.by_name
+    assert rebuilt.by_suffix == index.by_suffix
+    assert rebuilt.by_alias == index.by_alias
+    assert rebuilt.referrers == index.referrers
+
+
+def test_closer_folder_and_shallower_path_win(husidian):
+    index = husidian.LinkIndex()
+    for path in ["deep/er/x.md", "b/x.md", "x.md", "a/src.md", "b/src.md"]:
+        index.set_note(path, ["x"] if path.endswith("src.md") else [])
+    assert index.links_to("b/src.md", "b/x.md")
+    assert index.links_to("a/src.md", "x.md")
+
+
+def test_late_note_resolves_waiting_links(husidian):
+    index = husidian.LinkIndex()
+    index.set_note("a.md", ["later"])
+    assert index.set_note("folder/Later.md", []) == ([("a.md", "folder/Later.md")], [])
+    assert index.remove_note("folder/Later.md") == ([], [("a.md", "folder/Later.md")])
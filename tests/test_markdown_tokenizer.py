@@ -0,0 +1,46 @@
+import pytest
+
+
+@pytest.mark.parametrize("text, tags, links, aliases", [
+    # Fenced code is skipped until a closing fence of the same character that is at least as long
+    ("before #a\n```\n#inside [[hidden]]\n```\nafter #b", {"a", "b"}, set(), set()),
+    ("~~~python\n#no\n```\n#still_no\n~~~\n#yes", {"yes"}, set(), set()),
+    ("````\n```\n#no\n````\n#yes", {"yes"}, set(), set()),
+    # Inline code, including double-backtick spans holding a backtick
+    ("use `#no [[nolink]]` and ``x ` #no`` #ok", {"ok"}, set(), set()),
+    # URL fragments are not tags
+    ("see https://example.com/page#frag and http://x.org/#t #real", {"real"}, set(), set()),
+    # Headings, display text and embeds of links; [[#heading]] points into the same note
+    ("[[Note#Heading|shown]] ![[image.png]] [[folder/Other.md]] [[#local]]",
+     set(), {"Note", "image.png", "folder/Other"}, set()),
+    # Numeric tags do not count and a tag must not follow a word
+    ("#123 #a1 foo#bar (#paren)", {"a1", "paren"}, set(), set()),
+])
+def test_body(husidian, text, tags, links, aliases):
+    assert husidian.parse_metadata(text) == (tags, links, aliases)
+
+
+@pytest.mark.parametrize("text, tags, aliases", [
+    ("---\ntags:\n  - one\n  - 'two'\naliases: [First, \"Second\"]\n---\n#three",
+     {"one", "two", "three"}, {"First", "Second"}),
+    ("---\ntag: alpha beta\nalias: Solo\n---\nbody", {"alpha", "beta"}, {"Solo"}),
+    ("\ufeff---\ntags: [x, y]\n...\n#z", {"x", "y", "z"}, set()),
+    # Only a --- on the first line opens frontmatter
+    ("text\n---\ntags: [x]\n---", set(), set()),
+])
+def test_frontmatter(husidian, text, tags, aliases):
+    assert husidian.parse_metadata(text) == (tags, set(), aliases)
+
+
+def test_read_metadata_matches_parse_metadata(husidian, tmp_path):
+    text = "---\ntags: [a]\n---\n```\n#no\n```\n#b [[c]]\r\nlast #d"
+    path = tmp_path / "note.md"
+    path.write_bytes(text.encode())
+    *metadata, digest = husidian.read_metadata(str(path))
+    assert tuple(metadata) == husidian.parse_metadata(text)
+    assert digest
+
+
+def test_read_metadata_skips_a_folder(husidian, tmp_path):
+    (tmp_path / "folder.md").mkdir()
+    assert husidian.read_metadata(str(tmp_path / "folder.md")) is None
@@ -0,0 +1,71 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+NAMES = [f"n{i}.md" for i in range(12)] + ["tag", "#tag", "other", "#other"]
+
+
+def assert_same_graph(graph, reference):
+    assert set(graph.nodes) == set(reference.nodes)
+    assert graph.number_of_edges() == reference.number_of_edges()
+    assert {frozenset(edge) for edge in graph.edges} == {frozenset(edge) for edge in reference.edges}
+    for name in reference:
+        assert sorted(graph.neighbors(name)) == sorted(reference.neighbors(name))
+
+    # The arrays agree with the name-based view
+    indptr, indices = graph.csr()
+    for name, node_id in graph.index.items():
+        assert sorted(graph.names[j] for j in indices[indptr[node_id]:indptr[node_id + 1]]) == sorted(reference.neighbors(name))
+    assert [(graph.names[i], graph.names[j]) for i, j in graph.coo()] == graph.edges
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_edits_match_networkx(husidian, seed):
+    rng = random.Random(seed)
+    graph, reference = husidian.VaultGraph(), nx.Graph()
+    for _ in range(300):
+        operation = rng.random()
+        if operation < 0.5:
+            a, b = rng.sample(NAMES, 2)
+            graph.add_edge(a, b)
+            reference.add_edge(a, b)
+        elif operation < 0.7 and reference.number_of_edges():
+            a, b = rng.choice(list(reference.edges))
+            graph.remove_edge(a, b)
+            reference.remove_edge(a, b)
+        elif operation < 0.85:
+            name = rng.choice(NAMES)
+            graph.add_node(name)
+            reference.add_node(name)
+        elif len(reference):
+            name = rng.choice(list(reference))
+            graph.remove_node(name)
+            reference.remove_node(name)
+        assert_same_graph(graph, reference)
+
+    assert_same_graph(graph.copy(), reference)
+    exported = graph.to_networkx()
+    assert set(exported.nodes) == set(reference.nodes)
+    assert {frozenset(edge) for edge in exported.edges} == {frozenset(edge) for edge in reference.edges}
+
+
+def test_kinds_and_reused_ids(husidian):
+    graph = husidian.VaultGraph(edges=[("a.md", "tag"), ("a.md", "#tag")])
+    assert graph.kind("a.md") == husidian.NODE_NOTE
+    assert graph.kind("#tag") == husidian.NODE_TAG
+    assert graph.kind("tag") == husidian.NODE_PLAIN_TAG
+
+    freed = graph.index["tag"]
+    graph.remove_node("tag")
+    assert graph.add_node("#new") == freed
+    assert graph.kinds[freed] == husidian.NODE_TAG
+    assert np.array_equal(graph.coo(), [[graph.index["a.md"], graph.index["#tag"]]])
+
+
+def test_ego_nodes_expands_only_notes(husidian):
+    graph = husidian.VaultGraph(edges=[("a.md", "b.md"), ("b.md", "c.md"), ("a.md", "#t"), ("#t", "d.md")])
+    assert graph.ego_nodes("a.md", 1) == {"a.md", "b.md", "#t"}
+    assert graph.ego_nodes("a.md", 2) == {"a.md", "b.md", "c.md", "#t"}
+    assert graph.ego_nodes("a.md", 2, include_tags=False) == {"a.md", "b.md", "c.md"}